@@ -1,33 +1,62 @@
-import argparse, os, sys, concurrent.futures, json
-from .config import ForgeConfig
-from .forge_runner import run_on_pdf
-from .ingest_io import iter_pdf_paths
+import argparse, os, sys, json, time
+from contextlib import redirect_stdout
+
+def claim_stdout():
+    """
+    Keep the real stdout for result lines and point fd 1 at stderr. PyMuPDF prints
+    notices to stdout (at import, from find_tables), worker processes inherit fd 1,
+    and neither may end up inside the NDJSON stream.
+    """
+    sys.stdout.flush()
+    out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    return out
 
 def main():
-    ap = argparse.ArgumentParser(description="mini-pengin (macOS)")
-    ap.add_argument("--input", required=True); ap.add_argument("--out", required=True)
-    ap.add_argument("--ocr", choices=["auto","tesseract","deepseek","off"], default="auto")
-    ap.add_argument("--ocr-lang", default=None)
-    ap.add_argument("--deepseek-prompt", choices=["markdown","plain"], default="markdown")
-    ap.add_argument("--text-engine", choices=["pymupdf","docling"], default="pymupdf")
-    ap.add_argument("--lang-detector", choices=["auto","off"], default="auto")
-    ap.add_argument("--min-text-perc", type=float, default=0.55)
-    ap.add_argument("--workers", type=int, default=2)
-    ap.add_argument("--save-pages", action="store_true")
-    ap.add_argument("--keep-jsonl", action="store_true")
-    ap.add_argument("--tables", choices=["auto","docling","camelot","off"], default="auto")
-    a = ap.parse_args()
-    cfg = ForgeConfig(min_text_page_ratio=a.min_text_perc, ocr_engine=a.ocr, ocr_lang=a.ocr_lang, deepseek_prompt=a.deepseek_prompt,
-                      text_engine=a.text_engine, lang_detector=a.lang_detector, save_pages=a.save_pages, keep_jsonl=a.keep_jsonl,
-                      workers=a.workers, tables=a.tables)
+    if sys.argv[1:2] == ["serve"]:
+        from .serve import main as serve
+        return serve(sys.argv[2:])
+    out = claim_stdout()
+    # The pipeline imports PyMuPDF, so it is imported only once stdout is claimed
+    from .discover import discover
+    from .run_manifest import RunManifest
+    from .cli_args import add_pipeline_args, config_from_args
+    from .worker_pool import run_all
+    from .tables.table_sink import close_sinks
+    from .shard_writer import close_writers
+    from .progress import Progress
+    from .spans import SpanSummary
+    ap = argparse.ArgumentParser(description="mini-pengin (macOS); `mini-pengin serve --help` for the daemon")
+    ap.add_argument("--input", required=True, help="PDF or directory; - reads paths (or JSONL with a path field) from stdin")
+    ap.add_argument("--out", required=True)
+    add_pipeline_args(ap)
+    ap.add_argument("--discover-threads", type=int, default=0, help="list input directories with N threads (wide or remote trees)")
+    ap.add_argument("--results", choices=["ndjson","json"], default="ndjson",
+                    help="ndjson: one result/error line on stdout per finished PDF; json: one array at the end")
+    ap.add_argument("--progress", type=float, default=10.0, help="seconds between progress lines on stderr (0 = off)")
+    ap.add_argument("--force", action="store_true", help="ignore the run manifest and reprocess every PDF")
+    with redirect_stdout(out):  # --help
+        a = ap.parse_args()
+    cfg = config_from_args(a)
     os.makedirs(a.out, exist_ok=True)
-    pdfs = list(iter_pdf_paths(a.input))
-    if not pdfs: print("No PDFs found.", file=sys.stderr); sys.exit(2)
-    results=[]; 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=cfg.workers) as ex:
-        futs=[ex.submit(run_on_pdf, p, a.out, cfg) for p in pdfs]
-        for f in concurrent.futures.as_completed(futs):
-            try: results.append(f.result())
-            except Exception as e: print(f"[ERR] {e}", file=sys.stderr)
-    print(json.dumps(results, indent=2))
+    manifest = None if a.force else RunManifest(a.out)
+    results=[]; progress = Progress(interval=a.progress); timings = SpanSummary()
+    pdfs = progress.count(discover(a.input, a.discover_threads))  # streamed: work starts with the first path
+    run = time.strftime("%Y%m%dT%H%M%S")
+    for path, res in run_all(pdfs, a.out, cfg, manifest):
+        if isinstance(res, Exception):
+            progress.update(error=True)
+            print(f"[ERR] {res}", file=sys.stderr)
+            if a.results == "ndjson": print(json.dumps(res.to_dict(), ensure_ascii=False), file=out, flush=True)
+            continue
+        if manifest is not None and not res.get("skipped"): manifest.record(path, res)
+        progress.update(res)
+        if not res.get("skipped"): timings.add(res.get("timings", {}))
+        if a.results == "ndjson": print(json.dumps(dict(res, path=path), ensure_ascii=False), file=out, flush=True)
+        else: results.append(res)
+    close_sinks(); close_writers(); progress.close()
+    if not progress.total: print("No PDFs found.", file=sys.stderr); sys.exit(2)
+    with open(os.path.join(a.out, f"timings-{run}.json"), "w", encoding="utf-8") as f:
+        json.dump(timings.summary(), f, indent=2)
+    if a.results == "json": print(json.dumps(results, indent=2), file=out, flush=True)
 if __name__ == "__main__": main()
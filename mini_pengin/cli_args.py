@@ -0,0 +1,56 @@
+import argparse
+from .config import ForgeConfig
+from .lanes import parse_lane_workers
+
+def add_pipeline_args(ap: argparse.ArgumentParser) -> None:
+    """Flags that map onto ForgeConfig, shared by batch runs and `serve`."""
+    ap.add_argument("--ocr", choices=["auto","tesseract","deepseek","off","stub"], default="auto",
+                    help="stub: benchmark stand-in that renders pages and waits --ocr-stub-ms per page instead of running a model")
+    ap.add_argument("--ocr-lang", default=None)
+    ap.add_argument("--deepseek-prompt", choices=["markdown","plain"], default="markdown")
+    ap.add_argument("--ocr-dpi", type=int, default=0, help="fixed OCR render DPI; 0 picks it per page")
+    ap.add_argument("--ocr-max-dpi", type=int, default=300)
+    ap.add_argument("--ocr-batch-size", type=int, default=8)
+    ap.add_argument("--ocr-batch-wait-ms", type=float, default=20.0)
+    ap.add_argument("--ocr-stub-ms", type=float, default=250.0)
+    ap.add_argument("--ocr-precision", choices=["fp32","bf16","int8"], default="fp32",
+                    help="DeepSeek-OCR on CPU: bf16 (needs native CPU support, else fp32) or int8 dynamic quantization (cached on disk)")
+    ap.add_argument("--text-engine", choices=["pymupdf","docling"], default="pymupdf")
+    ap.add_argument("--lang-detector", choices=["auto","ngram","langdetect","off"], default="auto",
+                    help="auto/ngram: per-page n-gram language ID; langdetect: one seeded guess over the first 10k chars")
+    ap.add_argument("--route", choices=["page","document"], default="page", help="OCR decision per page or per document")
+    ap.add_argument("--min-text-perc", type=float, default=0.55)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--executor", choices=["thread","process","lanes"], default="thread")
+    ap.add_argument("--max-inflight", type=int, default=0, help="thread/process: max documents submitted at once (0 = 4 x workers)")
+    ap.add_argument("--lane-workers", default=None, help="per-lane concurrency for --executor lanes, e.g. native=8,ocr=1,tables=2")
+    ap.add_argument("--lane-queue", type=int, default=64)
+    ap.add_argument("--save-pages", action="store_true")
+    ap.add_argument("--keep-jsonl", action="store_true")
+    ap.add_argument("--stream-post", choices=["auto","on","off"], default="auto",
+                    help="post-process page by page from a disk spill in bounded memory (auto: large documents)")
+    ap.add_argument("--stream-min-pages", type=int, default=1000)
+    ap.add_argument("--tokenizer", default="regex", help="regex, or a Hugging Face tokenizer already in the local cache")
+    ap.add_argument("--chunk-tokens", type=int, default=0, help="write chunks.jsonl with chunks of at most N tokens (0 = off)")
+    ap.add_argument("--chunk-overlap", type=int, default=0, help="tokens repeated between consecutive chunks")
+    ap.add_argument("--tables", choices=["auto","pymupdf","docling","camelot","off"], default="auto")
+    ap.add_argument("--table-min-score", type=float, default=4.0, help="auto: escalate to Docling/Camelot below this PyMuPDF table score")
+    ap.add_argument("--table-format", choices=["files","columnar"], default="files",
+                    help="columnar: append all tables as cells to one Parquet (or CSV) file per run")
+    ap.add_argument("--table-gate", choices=["on","off"], default="on", help="auto mode: skip table engines on pages without table evidence")
+    ap.add_argument("--output", choices=["tree","shards"], default="tree",
+                    help="shards: append JSONL records to rotating shards under shards/ instead of a directory per PDF")
+    ap.add_argument("--shard-max-mb", type=float, default=256.0)
+    ap.add_argument("--shard-gzip", action="store_true", help="gzip shards (one member per document, still seekable)")
+    ap.add_argument("--profile", action="store_true", help="write a cProfile dump per PDF to <out>/profiles/ (slow)")
+
+def config_from_args(a: argparse.Namespace, **extra) -> ForgeConfig:
+    return ForgeConfig(min_text_page_ratio=a.min_text_perc, route_granularity=a.route, ocr_engine=a.ocr, ocr_lang=a.ocr_lang, deepseek_prompt=a.deepseek_prompt,
+                       ocr_dpi=a.ocr_dpi, ocr_max_dpi=a.ocr_max_dpi, ocr_batch_size=a.ocr_batch_size, ocr_batch_wait_ms=a.ocr_batch_wait_ms, ocr_stub_ms=a.ocr_stub_ms,
+                       ocr_precision=a.ocr_precision,
+                       text_engine=a.text_engine, lang_detector=a.lang_detector, save_pages=a.save_pages, keep_jsonl=a.keep_jsonl,
+                       stream_post=a.stream_post, stream_min_pages=a.stream_min_pages,
+                       tokenizer=a.tokenizer, chunk_tokens=a.chunk_tokens, chunk_overlap=a.chunk_overlap,
+                       output=a.output, shard_max_mb=a.shard_max_mb, shard_gzip=a.shard_gzip, profile=a.profile,
+                       workers=a.workers, max_inflight=a.max_inflight, executor=a.executor, lane_workers=parse_lane_workers(a.lane_workers),
+                       lane_queue=a.lane_queue, tables=a.tables, table_min_score=a.table_min_score, table_format=a.table_format, table_gate=(a.table_gate == "on"), **extra)
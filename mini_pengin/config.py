@@ -1,18 +1,39 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 @dataclass
 class ForgeConfig:
     min_text_page_ratio: float = 0.55
     max_pages_probe: int = 12
-    ocr_engine: str = "auto"            # auto|tesseract|deepseek|off
+    route_granularity: str = "page"     # page|document (OCR per page vs whole document)
+    ocr_engine: str = "auto"            # auto|tesseract|deepseek|off|stub (benchmarks: render + fixed delay, no model)
     ocr_lang: Optional[str] = None
     deepseek_prompt: str = "markdown"   # markdown|plain
+    ocr_dpi: int = 0                    # 0 = adaptive per page (see deepseek_extractor.pick_dpi)
+    ocr_max_dpi: int = 300
+    ocr_batch_size: int = 8             # pages grouped per call into the shared OCR service (no batched forward); 1 = inline
+    ocr_batch_wait_ms: float = 20.0
+    ocr_stub_ms: float = 250.0          # --ocr stub: simulated inference time per page
+    ocr_precision: str = "fp32"         # fp32|bf16|int8 DeepSeek-OCR weights on CPU (bf16 falls back to fp32 without CPU support)
     text_engine: str = "pymupdf"
-    lang_detector: str = "auto"
+    lang_detector: str = "auto"         # auto|ngram (per-page n-gram model) | langdetect | off
     save_pages: bool = False
     keep_jsonl: bool = False
+    stream_post: str = "auto"           # auto|on|off: spill pages to disk, post-process in bounded memory
+    stream_min_pages: int = 1000        # auto: stream documents with at least this many pages
+    tokenizer: str = "regex"            # regex | a locally cached Hugging Face tokenizer name/path
+    chunk_tokens: int = 0               # >0: write chunks.jsonl with chunks of at most this many tokens
+    chunk_overlap: int = 0
+    output: str = "tree"                # tree (directory per document) | shards (rotating JSONL shards + index)
+    shard_max_mb: float = 256.0
+    shard_gzip: bool = False
+    table_roll_secs: float = 0.0        # columnar tables: start a new Parquet part this often (serve), 0 = one file
+    profile: bool = False               # cProfile each document into <out>/profiles/<doc_id>.prof
     workers: int = 2
+    max_inflight: int = 0               # thread/process: documents submitted but unfinished (0 = 4 x workers)
+    executor: str = "thread"            # thread|process|lanes
+    lane_workers: Dict[str, int] = field(default_factory=dict)  # lanes: route|native|ocr|tables|post
+    lane_queue: int = 64
     classify_kind: bool = False
     doc_kind_mode: str = "zero-shot"
     doc_kind_model: str = "MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli"
@@ -20,4 +41,8 @@ class ForgeConfig:
         "invoice","receipt","resume","academic_paper","legal_contract","form","slides","report","other"
     ])
     doc_kind_hypothesis: str = "This document is {}."
-    tables: str = "auto"                # auto|docling|off
+    tables: str = "auto"                # auto|pymupdf|docling|camelot|off
+    table_min_score: float = 4.0        # auto: escalate past PyMuPDF when its best score_table is lower
+    table_format: str = "files"         # files (per-doc CSV/HTML) | columnar (one Parquet/CSV per run)
+    table_gate: bool = True             # auto mode: score pages cheaply, run engines on candidates only
+    table_gate_threshold: float = 0.5
@@ -0,0 +1,83 @@
+import os, sys, json, queue, threading
+from typing import Iterable, Iterator, TextIO
+from .ingest_io import iter_pdf_paths
+
+_DONE = object()
+
+def iter_pdf_paths_parallel(root: str, threads: int = 8, queue_max: int = 10000) -> Iterator[str]:
+    """
+    iter_pdf_paths with `threads` scanners listing directories concurrently (network
+    filesystems, very wide trees). Paths arrive in no particular order through a
+    bounded queue, so scanners pause once queue_max paths wait unconsumed.
+    """
+    if not os.path.isdir(root):
+        yield from iter_pdf_paths(root); return
+    out: queue.Queue = queue.Queue(queue_max)
+    dirs: queue.Queue = queue.Queue()
+    stop, lock, pending = threading.Event(), threading.Lock(), [1]
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try: out.put(item, timeout=0.1); return True
+            except queue.Full: pass
+        return False
+
+    def scan() -> None:
+        while True:
+            d = dirs.get()
+            if d is None or stop.is_set(): return
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        try:
+                            if e.is_dir(follow_symlinks=False):
+                                with lock: pending[0] += 1
+                                dirs.put(e.path)
+                            elif e.name.lower().endswith(".pdf") and e.is_file() and not put(e.path):
+                                return
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+            with lock:
+                pending[0] -= 1
+                last = pending[0] == 0
+            if last:
+                for _ in range(threads): dirs.put(None)
+                put(_DONE)
+
+    dirs.put(root)
+    for i in range(max(1, threads)):
+        threading.Thread(target=scan, daemon=True, name=f"discover-{i}").start()
+    try:
+        while True:
+            item = out.get()
+            if item is _DONE: return
+            yield item
+    finally:
+        stop.set()
+        for _ in range(threads): dirs.put(None)
+
+def iter_path_list(stream: TextIO) -> Iterator[str]:
+    """
+    Paths from a list, one per line: a PDF, a directory (walked), or a JSON object
+    with a "path" field (e.g. lines of another run's manifest.jsonl). Blank lines
+    and lines starting with # are skipped. Listed files are taken as they are.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            line = json.loads(line).get("path") or ""
+            if not line: continue
+        if os.path.isdir(line): yield from iter_pdf_paths(line)
+        else: yield line
+
+def discover(source: str, threads: int = 0) -> Iterable[str]:
+    """Input paths for --input: "-" reads a path list from stdin; threads > 1 scans directories in parallel."""
+    if source == "-":
+        return iter_path_list(sys.stdin)
+    if threads > 1:
+        return iter_pdf_paths_parallel(source, threads)
+    return iter_pdf_paths(source)
@@ -0,0 +1,84 @@
+import os, mmap, hashlib
+from typing import Dict, List, Optional
+import fitz
+
+class DocSession:
+    """
+    One open PDF shared by every stage of run_on_pdf.
+    The file is memory-mapped once (hash + fitz parse come from that buffer),
+    and per-page text / image data is computed at most once.
+    Pass cache_text=False to keep page text out of memory (streaming mode).
+    """
+    def __init__(self, path: str, cache_text: bool = True):
+        self.path = path
+        self.cache_text = cache_text
+        self._fh = None
+        self._mm = None
+        self._view: Optional[memoryview] = None
+        self._doc = None
+        self._sha256: Optional[str] = None
+        self._text: Dict[int, str] = {}
+        self._images: Dict[int, list] = {}
+
+    def __enter__(self): return self
+    def __exit__(self, *a): self.close()
+
+    @property
+    def data(self) -> memoryview:
+        """Raw file bytes (read-only), mapped on first access."""
+        if self._view is None:
+            self._fh = open(self.path, "rb")
+            if os.fstat(self._fh.fileno()).st_size:
+                self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mm)
+            else:
+                self._view = memoryview(b"")
+        return self._view
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    @property
+    def doc(self):
+        """The parsed fitz document (opened once from the mapped bytes)."""
+        if self._doc is None:
+            self._doc = fitz.open(stream=self.data, filetype="pdf")
+        return self._doc
+
+    def __len__(self) -> int:
+        return len(self.doc)
+
+    def page_text(self, i: int) -> str:
+        t = self._text.get(i)
+        if t is None:
+            t = self.doc[i].get_text("text") or ""
+            if self.cache_text: self._text[i] = t
+        return t
+
+    def page_texts(self) -> List[str]:
+        return [self.page_text(i) for i in range(len(self))]
+
+    def page_images(self, i: int) -> list:
+        """page.get_images(full=True) for page i (cached; cheap metadata)."""
+        im = self._images.get(i)
+        if im is None:
+            im = self._images[i] = self.doc[i].get_images(full=True)
+        return im
+
+    def close(self) -> None:
+        if self._doc is not None:
+            self._doc.close(); self._doc = None
+        if self._view is not None:
+            try: self._view.release()
+            except BufferError: pass  # still exported elsewhere; GC will finish it
+            self._view = None
+        if self._mm is not None:
+            try: self._mm.close()
+            except BufferError: pass
+            self._mm = None
+        if self._fh is not None:
+            self._fh.close(); self._fh = None
+        self._text.clear()
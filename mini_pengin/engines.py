@@ -0,0 +1,75 @@
+import importlib, importlib.util, threading, time
+from typing import Callable, Dict, Optional, Tuple
+from .spans import span
+
+# "kind:name" -> (module, attribute, packages the engine needs to run). Nothing here is
+# imported until get() first asks for it, so a native-only run never loads torch,
+# transformers, pandas or docling.
+ENGINES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "ocr:deepseek":    ("mini_pengin.extractors.deepseek_extractor", "ocr_pages_deepseek", ("torch", "transformers")),
+    "ocr:stub":        ("mini_pengin.extractors.stub_ocr", "ocr_pages_stub", ()),
+    "warm:deepseek":   ("mini_pengin.extractors.deepseek_extractor", "warm", ("torch", "transformers")),
+    "precision:deepseek": ("mini_pengin.extractors.deepseek_extractor", "loaded_precision", ("torch", "transformers")),
+    "text:docling":    ("mini_pengin.tables.docling_tables", "convert_docling", ("pandas", "docling")),
+    "warm:docling":    ("mini_pengin.tables.docling_tables", "get_converter", ("pandas", "docling")),
+    "tables:pymupdf":  ("mini_pengin.tables.pymupdf_tables", "extract_tables_pymupdf", ("pandas",)),
+    "tables:docling":  ("mini_pengin.tables.docling_tables", "extract_tables_docling", ("pandas", "docling")),
+    "tables:camelot":  ("mini_pengin.tables.camelot_tables", "extract_tables_camelot", ("pandas", "camelot")),
+    "tables:markdown": ("mini_pengin.tables.ocr_md_tables", "extract_tables_from_markdown_pages", ("pandas",)),
+}
+
+_RESOLVED: Dict[str, Optional[Callable]] = {}
+_STATS: Dict[str, Dict] = {}  # key -> {"import_ms", "error"}
+_LOCK = threading.RLock()
+
+def register(key: str, module: str, attr: str, requires: Tuple[str, ...] = ()) -> None:
+    """Add or replace an engine ("kind:name")."""
+    with _LOCK:
+        ENGINES[key] = (module, attr, requires)
+        _RESOLVED.pop(key, None)
+
+def available(key: str) -> bool:
+    """Whether the engine can probably load (its packages are installed), without importing anything."""
+    if key in _RESOLVED and _RESOLVED[key] is None:
+        return False
+    spec = ENGINES.get(key)
+    return spec is not None and all(importlib.util.find_spec(m) is not None for m in spec[2])
+
+def get(key: str) -> Optional[Callable]:
+    """The engine's function, imported on first use; None when it cannot be imported."""
+    fn = _RESOLVED.get(key, _RESOLVED)
+    if fn is not _RESOLVED:
+        return fn
+    with _LOCK:
+        if key in _RESOLVED:
+            return _RESOLVED[key]
+        module, attr, _ = ENGINES[key]
+        t0, fn, err = time.perf_counter(), None, None
+        with span(f"import.{key.replace(':', '.')}"):
+            try:
+                fn = getattr(importlib.import_module(module), attr)
+            except Exception as e:
+                err = f"{type(e).__name__}: {e}"
+        _STATS[key] = {"import_ms": round((time.perf_counter() - t0) * 1000, 3), "error": err}
+        _RESOLVED[key] = fn
+        return fn
+
+def import_stats() -> Dict[str, Dict]:
+    """Import cost (and failure, if any) of every engine resolved so far in this process."""
+    with _LOCK:
+        return {k: dict(v) for k, v in _STATS.items()}
+
+def main() -> None:
+    """python -m mini_pengin.engines: import every engine once and report availability and cost."""
+    import json
+    from .__main__ import claim_stdout
+    out = claim_stdout()
+    t0 = time.perf_counter()
+    import mini_pengin.cli_args, mini_pengin.worker_pool  # noqa: F401  (baseline: what every run pays)
+    print(json.dumps({"startup_ms": round((time.perf_counter() - t0) * 1000, 1)}), file=out, flush=True)
+    for key in ENGINES:
+        get(key)
+        print(json.dumps(dict(engine=key, available=available(key), **_STATS[key])), file=out, flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from contextlib import nullcontext
 from PIL import Image
+import io
 import os
+import threading
 import fitz, torch
 from transformers import AutoTokenizer, AutoModel
+from .ocr_batcher import OcrBatcher
+from ..utils.pdf_probe import image_dpi
+from ..doc_session import DocSession
+from ..spans import span
 
 # =================== Hardening (CPU-only, macOS/Python 3.13) ===================
 # Never expose a CUDA device; prefer simple, predictable CPU code paths.
@@ -90,41 +98,164 @@ except Exception:
 _MODEL = None
 _TOK = None
 _DEV = None
+_PRECISION: Optional[str] = None  # what the loaded model actually runs in
 _NAME = "deepseek-ai/DeepSeek-OCR"
 _REVISION: Optional[str] = None  # set to a specific commit/tag to pin remote code
+PRECISIONS = ("fp32", "bf16", "int8")
+CACHE_DIR = os.environ.get("MINI_PENGIN_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "mini_pengin")
+_LOAD_LOCK = threading.Lock()
 
-def _lazy():
-    """Lazy-load tokenizer/model on CPU only (stable on macOS)."""
-    global _MODEL, _TOK, _DEV
+def cpu_supports_bf16() -> bool:
+    """Native bf16 matmuls on this CPU (AVX512-BF16/AMX on x86, BF16 on Arm); emulated bf16 is slower than fp32."""
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        pass
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            flags = set(f.read().split())
+        return bool(flags & {"avx512_bf16", "amx_bf16", "bf16"})
+    except OSError:
+        return False
+
+def _int8_cache_path() -> str:
+    # Pickled modules are tied to the torch build and the model's remote code revision
+    tag = f"{_NAME.replace('/', '--')}-{_REVISION or 'main'}-torch{torch.__version__}-int8.pt"
+    return os.path.join(CACHE_DIR, tag)
+
+def _load_int8():
+    """
+    Linear layers dynamically quantized to int8 (weights int8, activations quantized per batch).
+    The quantized model is cached on disk, so later loads read int8 weights directly
+    instead of materializing the fp32 model and quantizing it again.
+    """
+    path = _int8_cache_path()
+    if os.path.exists(path):
+        try:
+            from transformers import AutoConfig
+            AutoConfig.from_pretrained(_NAME, trust_remote_code=True, revision=_REVISION)  # makes the remote classes importable
+            return torch.load(path, weights_only=False).eval()  # our own cache file, written below
+        except Exception:
+            pass  # stale or foreign cache: rebuild it
+    model = AutoModel.from_pretrained(_NAME, trust_remote_code=True, use_safetensors=True, revision=_REVISION).eval()
+    model = torch.ao.quantization.quantize_dynamic(model.to(torch.float32), {torch.nn.Linear}, dtype=torch.qint8)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        torch.save(model, tmp)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+    return model
+
+def _lazy(precision: str = "fp32"):
+    """Lazy-load tokenizer/model on CPU only (stable on macOS). The first caller's precision wins."""
+    global _MODEL, _TOK, _DEV, _PRECISION
     if _MODEL is not None:
         return
+    with _LOAD_LOCK:
+        if _MODEL is not None:
+            return
+
+        _DEV = "cpu"  # ← force CPU (MPS can be slow/flaky for this model)
+        if precision == "bf16" and not cpu_supports_bf16():
+            precision = "fp32"  # emulated bf16 would be slower than fp32
+
+        _TOK = AutoTokenizer.from_pretrained(_NAME, trust_remote_code=True, revision=_REVISION)
+        if precision == "int8":
+            model = _load_int8()
+        else:
+            model = AutoModel.from_pretrained(
+                _NAME,
+                trust_remote_code=True,
+                use_safetensors=True,
+                revision=_REVISION,
+            ).eval()
+            model = model.to(torch.bfloat16 if precision == "bf16" else torch.float32)  # stay on CPU
+        _PRECISION = precision
+        _MODEL = model
+
+def loaded_precision() -> Optional[str]:
+    """Precision the model was loaded in (after the bf16 fallback), or None before loading."""
+    return _PRECISION
+
+def warm(precision: str = "fp32") -> None:
+    """Load the model now (e.g. in a worker initializer) instead of on the first page."""
+    _lazy(precision)
+
+# infer() resizes to base_size for the global view and, in crop mode, tiles the
+# page into image_size crops (at most a 3x3 grid), so pixels beyond that are discarded.
+BASE_SIZE = 1024
+IMAGE_SIZE = 640
+MAX_TILES_PER_SIDE = 3
+
+def pick_dpi(page, max_dpi: float = 300, min_dpi: float = 72, crop_mode: bool = True,
+             text_chars: Optional[int] = None, images=None) -> float:
+    """
+    Render resolution for one page: enough pixels for the model input, never more
+    than the embedded scan actually holds, clamped to [min_dpi, max_dpi].
+    """
+    target_px = IMAGE_SIZE * MAX_TILES_PER_SIDE if crop_mode else BASE_SIZE
+    long_in = max(page.rect.width, page.rect.height) / 72.0
+    dpi = target_px / max(long_in, 1e-3)
+    img_dpi = image_dpi(page, images)
+    if text_chars is None:
+        text_chars = len((page.get_text("text") or "").strip())
+    if img_dpi > 0 and text_chars <= 40:
+        dpi = min(dpi, img_dpi)  # image-only page: upsampling the scan adds nothing
+    return max(min_dpi, min(max_dpi, dpi))
+
+def _iter_render(pdf, dpi: Optional[float] = 300, max_pages: Optional[int] = None,
+                 max_dpi: float = 300, pages: Optional[List[int]] = None) -> Iterator[Image.Image]:
+    """
+    Lazily render PDF pages to PIL images using PyMuPDF (no Poppler needed), one page at a time.
+    pdf is a path or a DocSession (rendered from its already-parsed document).
+    dpi=None picks a per-page resolution with pick_dpi (capped at max_dpi).
+    pages restricts rendering to those 0-based page indices (in the given order).
+    """
+    session = pdf if isinstance(pdf, DocSession) else None
+    with (nullcontext(session.doc) if session else fitz.open(pdf)) as doc:
+        for i, pno in enumerate(range(len(doc)) if pages is None else pages):
+            if max_pages is not None and i >= max_pages:
+                break
+            page = doc[pno]
+            if dpi:
+                zoom = dpi / 72.0
+            elif session:
+                zoom = pick_dpi(page, max_dpi=max_dpi, text_chars=len(session.page_text(pno).strip()),
+                                images=session.page_images(pno)) / 72.0
+            else:
+                zoom = pick_dpi(page, max_dpi=max_dpi) / 72.0
+            with span("ocr.render"):
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                del pix
+            yield img
+
+_SCRATCH: Optional[str] = None
+_IN_MEMORY = True  # flipped off if the remote infer() rejects file objects
+
+def _scratch_dir() -> str:
+    """One output_path for infer() per process; nothing is written there with save_results=False."""
+    global _SCRATCH
+    if _SCRATCH is None:
+        import tempfile
+        _SCRATCH = tempfile.mkdtemp(prefix="mini_pengin_ocr_")
+    return _SCRATCH
+
+def _image_handle(im: Image.Image) -> io.BytesIO:
+    """
+    In-memory stand-in for an image path: infer() hands image_file to PIL's
+    Image.open, which accepts file objects. BMP is an uncompressed dump of the
+    raster, so there is no JPEG encode/decode and no disk I/O per page.
+    """
+    buf = io.BytesIO()
+    im.save(buf, "BMP")
+    buf.seek(0)
+    buf.name = "page.bmp"
+    return buf
 
-    _DEV = "cpu"  # ← force CPU (MPS can be slow/flaky for this model)
-
-    _TOK = AutoTokenizer.from_pretrained(_NAME, trust_remote_code=True, revision=_REVISION)
-    _MODEL = AutoModel.from_pretrained(
-        _NAME,
-        trust_remote_code=True,
-        use_safetensors=True,
-        revision=_REVISION,
-    ).eval()
-
-    _MODEL = _MODEL.to(torch.float32)  # stay on CPU
-
-def _render(pdf: str, dpi: int = 300) -> List[Image.Image]:
-    """Render PDF pages to PIL images using PyMuPDF (no Poppler needed)."""
-    images: List[Image.Image] = []
-    zoom = dpi / 72.0
-    mat = fitz.Matrix(zoom, zoom)
-    with fitz.open(pdf) as doc:
-        for page in doc:
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
-            images.append(img)
-            del pix
-    return images
-
-def _tesseract_fallback(images: List[Image.Image], lang: Optional[str] = None) -> List[str]:
+def _tesseract_fallback(images: Iterable[Image.Image], lang: Optional[str] = None) -> List[str]:
     """Fallback OCR via Tesseract if DeepSeek fails."""
     try:
         import pytesseract
@@ -139,22 +270,93 @@ def _tesseract_fallback(images: List[Image.Image], lang: Optional[str] = None) -
             out.append("")
     return out
 
+def _infer_batch(items: List[Tuple[Image.Image, str]]) -> List[str]:
+    """
+    Run a group of (image, prompt) pages under one no_grad context and scratch dir.
+    DeepSeek-OCR's remote-code .infer() takes one image per call, so the group is
+    looped here; this is the single place a batched forward would plug in.
+    """
+    global _IN_MEMORY
+    _lazy()
+    out: List[str] = []
+    td = _scratch_dir()
+    # bf16 weights: autocast casts the fp32 tensors remote code builds from the image
+    amp = torch.autocast("cpu", dtype=torch.bfloat16) if _PRECISION == "bf16" else nullcontext()
+    with torch.no_grad(), amp:
+        for i, (im, prompt) in enumerate(items):
+            res, on_disk = None, not _IN_MEMORY
+            if _IN_MEMORY:
+                try:
+                    res = _infer_one(prompt, _image_handle(im), td)
+                except (TypeError, AttributeError):
+                    _IN_MEMORY, on_disk = False, True  # remote code wants a real path; use temp files from now on
+                except OSError:
+                    on_disk = True  # this page only (e.g. a decode hiccup); keep the in-memory path
+            if on_disk:
+                fp = os.path.join(td, f"p{threading.get_ident()}_{i}.jpg")
+                im.save(fp, "JPEG", quality=95)
+                try:
+                    res = _infer_one(prompt, fp, td)
+                finally:
+                    os.remove(fp)
+
+            text = None
+            if isinstance(res, dict):
+                text = res.get("text") or res.get("markdown") or res.get("output")
+            elif isinstance(res, str):
+                text = res
+
+            out.append((text or "").strip())
+    return out
+
+def _infer_one(prompt: str, image_file, td: str):
+    # DeepSeek-OCR exposes .infer() via trust_remote_code
+    return _MODEL.infer(
+        _TOK,
+        prompt=prompt,
+        image_file=image_file,
+        output_path=td,
+        base_size=BASE_SIZE,
+        image_size=IMAGE_SIZE,
+        crop_mode=True,
+        save_results=False,
+        test_compress=False,
+    )
+
+_BATCHER: Optional[OcrBatcher] = None
+_BATCHER_LOCK = threading.Lock()
+
+def _get_batcher(max_batch: int, max_wait_ms: float) -> OcrBatcher:
+    """Process-wide inference service; the first caller's batch settings win."""
+    global _BATCHER
+    with _BATCHER_LOCK:
+        if _BATCHER is None:
+            _BATCHER = OcrBatcher(_infer_batch, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        return _BATCHER
+
 def ocr_pages_deepseek(
-    pdf: str,
-    dpi: int = 300,
+    pdf,
+    dpi: Optional[float] = None,
+    max_dpi: float = 300,
     prompt_mode: str = "markdown",  # "markdown" | "plain"
     max_pages: Optional[int] = None,
+    batch_size: int = 8,
+    batch_wait_ms: float = 20.0,
+    pages: Optional[List[int]] = None,
+    precision: str = "fp32",
 ) -> List[str]:
     """
     Returns per-page OCR text using DeepSeek-OCR via Transformers.
+    pdf is a path or a DocSession.
     - markdown: strong prompt for GitHub pipe-table syntax (parseable later)
     - plain   : free OCR text
+    dpi=None chooses the render resolution per page (see pick_dpi); a number forces it.
+    pages limits OCR to those 0-based page indices; the result follows that order.
+    batch_size > 1 routes pages through the shared OcrBatcher; 1 calls the model inline.
+    precision: fp32 | bf16 (fp32 on CPUs without native bf16) | int8 (dynamic quantization
+    of the linear layers, cached on disk); the process loads the model once, in the first precision asked for.
     If DeepSeek fails for any reason, falls back to Tesseract OCR.
     """
-    images = _render(pdf, dpi=dpi)
-    if max_pages is not None:
-        images = images[:max_pages]
-
     # Strong Markdown prompt baked in for --deepseek-prompt markdown
     if prompt_mode == "markdown":
         prompt = (
@@ -166,40 +368,45 @@ def ocr_pages_deepseek(
     else:
         prompt = "<image>\nFree OCR."
 
-    # Try DeepSeek on CPU
+    # Try DeepSeek on CPU. Pages are rendered lazily and at most a small window
+    # of them is alive at once, so peak memory does not grow with page count.
     try:
-        _lazy()
+        _lazy(precision)
         out: List[str] = []
-        import tempfile
-        with tempfile.TemporaryDirectory() as td, torch.no_grad():
-            for i, im in enumerate(images):
-                fp = os.path.join(td, f"p{i}.jpg")
-                im.save(fp, "JPEG", quality=95)
-
-                # DeepSeek-OCR exposes .infer() via trust_remote_code
-                res = _MODEL.infer(
-                    _TOK,
-                    prompt=prompt,
-                    image_file=fp,
-                    output_path=td,
-                    base_size=1024,
-                    image_size=640,
-                    crop_mode=True,
-                    save_results=False,
-                    test_compress=False,
-                )
-
-                text = None
-                if isinstance(res, dict):
-                    text = res.get("text") or res.get("markdown") or res.get("output")
-                elif isinstance(res, str):
-                    text = res
-
-                out.append((text or "").strip())
+        if batch_size > 1:
+            # Shared inference worker: pages from all in-flight documents are
+            # micro-batched instead of every thread calling the model at once.
+            b = _get_batcher(batch_size, batch_wait_ms)
+            window = deque()
+            for im in _iter_render(pdf, dpi=dpi, max_pages=max_pages, max_dpi=max_dpi, pages=pages):
+                window.append(b.submit(im, prompt))
+                del im
+                if len(window) >= batch_size:
+                    with span("ocr.infer"):  # time spent waiting on the shared batcher
+                        out.append(window.popleft().result())
+            with span("ocr.infer"):
+                out.extend(f.result() for f in window)
+            return out
+        for im in _iter_render(pdf, dpi=dpi, max_pages=max_pages, max_dpi=max_dpi, pages=pages):
+            with span("ocr.infer"):
+                out.extend(_infer_batch([(im, prompt)]))
         return out
 
     except KeyboardInterrupt:
         raise
     except Exception:
         # Any DeepSeek failure → fallback OCR (local, CPU)
-        return _tesseract_fallback(images)
+        try:
+            import pytesseract  # noqa: F401
+        except Exception:
+            # Nothing to OCR with; don't rasterize pages just to count them
+            if pages is not None:
+                n = len(pages)
+            elif isinstance(pdf, DocSession):
+                n = len(pdf)
+            else:
+                with fitz.open(pdf) as d:
+                    n = len(d)
+            n = n if max_pages is None else min(n, max_pages)
+            return ["" for _ in range(n)]
+        return _tesseract_fallback(_iter_render(pdf, dpi=dpi, max_pages=max_pages, max_dpi=max_dpi, pages=pages))
@@ -1,6 +1,24 @@
 import fitz
-def extract_text_pymupdf(path: str):
-    d = fitz.open(path)
+from ..doc_session import DocSession
+
+def extract_text_pymupdf(src):
+    """Per-page text; src is a path or a DocSession (reuses its page text cache)."""
+    if isinstance(src, DocSession):
+        return src.page_texts()
+    d = fitz.open(src)
     out = [(p.get_text("text") or "") for p in d]
     d.close()
     return out
+
+def iter_text_pymupdf(src):
+    """Per-page text one page at a time (with DocSession(cache_text=False) nothing is retained)."""
+    if isinstance(src, DocSession):
+        for i in range(len(src)):
+            yield src.page_text(i)
+        return
+    d = fitz.open(src)
+    try:
+        for p in d:
+            yield p.get_text("text") or ""
+    finally:
+        d.close()
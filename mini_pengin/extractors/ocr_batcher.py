@@ -0,0 +1,60 @@
+import queue, threading, time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+class OcrBatcher:
+    """
+    Single in-process inference worker shared by every in-flight document.
+    Callers submit (image, prompt) pairs and get a Future per page; the worker
+    drains the queue into micro-batches of up to `max_batch` items, waiting at
+    most `max_wait_ms` for a batch to fill, and resolves each caller's future.
+    If a batch fails, its pages are retried one at a time, so only the failing
+    page's future carries the exception.
+
+    Batching here is grouping only: DeepSeek-OCR's .infer() takes one image, so
+    infer_batch loops the group and there is no batched forward pass. What a batch
+    buys is one no_grad/autocast context and scratch dir per group, and a bound on
+    how many rendered pages wait in memory; `max_batch` defaults to 8 for that
+    reason, not for throughput.
+    """
+    def __init__(self, infer_batch: Callable[[List[Tuple[Any, str]]], List[str]], max_batch: int = 8, max_wait_ms: float = 20.0):
+        self.infer_batch = infer_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._q: "queue.Queue[Tuple[Any, str, Future]]" = queue.Queue()
+        self._t = threading.Thread(target=self._loop, daemon=True, name="ocr-batcher")
+        self._t.start()
+
+    def submit(self, image, prompt: str) -> Future:
+        f: Future = Future()
+        self._q.put((image, prompt, f))
+        return f
+
+    def _take_batch(self) -> List[Tuple[Any, str, Future]]:
+        batch = [self._q.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            left = deadline - time.monotonic()
+            try: batch.append(self._q.get(timeout=left) if left > 0 else self._q.get_nowait())
+            except queue.Empty: break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._take_batch()
+            live = [b for b in batch if b[2].set_running_or_notify_cancel()]
+            if not live: continue
+            try:
+                texts = self.infer_batch([(im, pr) for im, pr, _ in live])
+                if len(texts) != len(live):
+                    raise RuntimeError(f"infer_batch returned {len(texts)} results for {len(live)} pages")
+            except BaseException as e:
+                if len(live) == 1:
+                    live[0][2].set_exception(e)
+                    continue
+                # One bad page must not fail the other documents in its batch: retry pages alone
+                for im, pr, f in live:
+                    try: f.set_result(self.infer_batch([(im, pr)])[0])
+                    except BaseException as e1: f.set_exception(e1)
+                continue
+            for (_, _, f), t in zip(live, texts): f.set_result(t)
@@ -0,0 +1,63 @@
+import time, threading
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
+import fitz
+from .ocr_batcher import OcrBatcher
+from ..doc_session import DocSession
+from ..spans import span
+
+STUB_MS_PER_PAGE = 250.0  # rough CPU DeepSeek-OCR cost per page, overridden by --ocr-stub-ms
+
+_BATCHER: Optional[OcrBatcher] = None
+_BATCHER_LOCK = threading.Lock()
+
+def _infer_batch(items: List[Tuple[Tuple[int, int], float]]) -> List[str]:
+    # One shared "model": pages wait their turn exactly like the real inference worker
+    time.sleep(sum(ms for _, ms in items) / 1000.0)
+    return [f"OCR stub page {w}x{h} px." for (w, h), _ in items]
+
+def _get_batcher(max_batch: int, max_wait_ms: float) -> OcrBatcher:
+    global _BATCHER
+    with _BATCHER_LOCK:
+        if _BATCHER is None:
+            _BATCHER = OcrBatcher(_infer_batch, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        return _BATCHER
+
+def ocr_pages_stub(
+    pdf,
+    dpi: Optional[float] = None,
+    max_dpi: float = 300,
+    prompt_mode: str = "markdown",
+    max_pages: Optional[int] = None,
+    batch_size: int = 8,
+    batch_wait_ms: float = 20.0,
+    pages: Optional[List[int]] = None,
+    precision: str = "fp32",
+    ms_per_page: float = STUB_MS_PER_PAGE,
+) -> List[str]:
+    """
+    Offline stand-in for ocr_pages_deepseek (same signature) for benchmarks without
+    model weights. Pages are really rendered, then a shared worker sleeps ms_per_page
+    per page in place of inference, so routing, rendering, batching and queueing
+    behave as with the model. precision is accepted and ignored. Returns a short
+    placeholder text per page.
+    """
+    session = pdf if isinstance(pdf, DocSession) else None
+    b = _get_batcher(batch_size, batch_wait_ms)
+    out, window = [], []
+    with (nullcontext(session.doc) if session else fitz.open(pdf)) as doc:
+        for i, pno in enumerate(range(len(doc)) if pages is None else pages):
+            if max_pages is not None and i >= max_pages:
+                break
+            with span("ocr.render"):
+                zoom = (dpi or min(max_dpi, 150)) / 72.0
+                pix = doc[pno].get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                size = (pix.width, pix.height)
+                del pix
+            window.append(b.submit(size, ms_per_page))
+            if len(window) >= batch_size:
+                with span("ocr.infer"):
+                    out.append(window.pop(0).result())
+    with span("ocr.infer"):
+        out.extend(f.result() for f in window)
+    return out
@@ -1,26 +1,82 @@
-import os
+import os, json, shutil, cProfile
+from contextlib import contextmanager, nullcontext
 from dataclasses import asdict
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
 from .config import ForgeConfig
-from .schemas import DocBundle
+from .schemas import DocBundle, DocJob
 from . import ingest_io
-from .route_scangate import build_probe, route_mode
-from .extractors.ink_extractor import extract_text_pymupdf
-from .postprocess.paraweld import ParaWeld
-from .postprocess.marklist_normalizer import MarklistNormalizer
-from .postprocess.page_tag_wiper import PageTagWiper
-from .postprocess.boiler_skim import BoilerSkim
-from .postprocess.tongue_tag import TongueTagger
-from .postprocess.token_meter import TokenMeter
+from .doc_session import DocSession
+from .run_manifest import RunManifest, stage_fingerprints
+from .route_scangate import build_probe, route_mode, route_pages, needs_ocr_hint
+from .extractors.ink_extractor import extract_text_pymupdf, iter_text_pymupdf
+from .postprocess.post_chain import PostChain
+from .postprocess.stream_post import PageSpill, stream_post
+from .postprocess.tongue_tag import PageTongues
+from .postprocess.token_meter import TokenMeter, get_tokenizer
+from .postprocess.chunker import Chunker
 
-try:
-    from .extractors.deepseek_extractor import ocr_pages_deepseek
-except Exception:
-    ocr_pages_deepseek = None
+from . import engines
+from .tables.table_sink import finalize_tables
+from .tables.table_gate import page_table_scores, candidate_pages
+from .shard_writer import get_writer, read_block
+from .spans import Spans, span, use_spans
 
-from .tables.docling_tables import extract_tables_docling
-from .tables.ocr_md_tables import extract_tables_from_markdown_pages
-from .tables.camelot_tables import extract_tables_camelot
+RAW_PAGES_NAME = "raw_pages.json"
+SPILL_NAME = "raw_pages.jsonl"      # streaming mode: raw pages, one JSON string per line
+SCRATCH_DIR = ".work"               # --output shards: per-document scratch (spills, resume caches)
+PROFILE_DIR = "profiles"            # --profile: one cProfile dump per document
+
+
+class StageError(RuntimeError):
+    """A document failed in one pipeline stage. Plain-string fields, so it pickles across processes."""
+    def __init__(self, path: str, stage: str, exc_type: str, message: str):
+        super().__init__(path, stage, exc_type, message)
+        self.path, self.stage, self.exc_type, self.message = path, stage, exc_type, message
+
+    def __str__(self) -> str:
+        return f"{self.path} [{self.stage}] {self.exc_type}: {self.message}"
+
+    def to_dict(self) -> Dict:
+        return {"path": self.path, "stage": self.stage, "error": self.exc_type, "message": self.message}
+
+
+def run_stage(stage: str, fn, job: DocJob, *args):
+    """Call one stage function, timed into job.spans (and profiled with --profile), tagging any
+    failure with the document path and stage name."""
+    if job.spans is None:
+        job.spans = Spans()
+    try:
+        with use_spans(job.spans), job.spans.span(stage):
+            if job.profiler is None:
+                return fn(job, *args)
+            job.profiler.enable()
+            try:
+                return fn(job, *args)
+            finally:
+                job.profiler.disable()
+    except StageError:
+        raise
+    except Exception as e:
+        raise StageError(job.path, stage, type(e).__name__, str(e)) from e
+
+
+def new_job(path: str, outdir: str, cfg: ForgeConfig) -> DocJob:
+    return DocJob(path=path, outdir=outdir, profiler=cProfile.Profile() if cfg.profile else None)
+
+
+def finish_job(job: DocJob) -> None:
+    """Release the document's resources; with --profile, dump its stats to profiles/<doc_id>.prof."""
+    if job.profiler is not None:
+        name = job.doc_id or os.path.splitext(os.path.basename(job.path))[0]
+        try:
+            _ensure_dir(os.path.join(job.outdir, PROFILE_DIR))
+            job.profiler.dump_stats(os.path.join(job.outdir, PROFILE_DIR, f"{name}.prof"))
+        except Exception:
+            pass
+        job.profiler = None
+    if job.result is not None and job.spans is not None:
+        job.result["timings"] = job.spans.as_dict()
+    job.close()
 
 
 def _ensure_dir(p):
@@ -36,39 +92,113 @@ def _concat_with_offsets(pages: List[str]):
     return "".join(pages), offs
 
 
-def _score_csv_table(csv_path: str) -> float:
+def _doc_dir(job: DocJob, cfg: ForgeConfig) -> str:
+    """The document's output directory, or its scratch directory with --output shards."""
+    if cfg.output == "shards":
+        return os.path.join(job.outdir, SCRATCH_DIR, job.doc_id)
+    return os.path.join(job.outdir, job.doc_id)
+
+
+def _keep_raw(cfg: ForgeConfig, ex: Dict, manifest: Optional[RunManifest]) -> bool:
+    # Only OCR'd documents keep a resume cache: re-extracting a text layer is cheaper than
+    # writing and re-reading a copy of it.
+    return manifest is not None and ex["routed"] != "non_ocr"
+
+
+def _output_exists(prev: Dict, base: str) -> bool:
+    res = prev.get("result", {})
+    if "offset" in res:  # shards: the block must have made it to disk
+        return os.path.exists(res["out"]) and os.path.getsize(res["out"]) >= res["offset"] + res["length"]
+    return os.path.exists(os.path.join(base, "docmeta.json"))
+
+
+def _prev_docmeta(prev: Dict, base: str) -> Optional[Dict]:
+    """docmeta of a previous run's output (tree file or the doc record in its shard), None if gone."""
+    res = prev.get("result", {})
+    if "offset" not in res:
+        return _load_json(os.path.join(base, "docmeta.json"))
+    try:
+        if os.path.getsize(res["out"]) < res["offset"] + res["length"]:
+            return None
+        return read_block(res["out"], res["offset"], res["length"])[0]
+    except Exception:
+        return None
+
+
+def _streaming(cfg: ForgeConfig, num_pages: int) -> bool:
+    return cfg.stream_post == "on" or (cfg.stream_post == "auto" and num_pages >= cfg.stream_min_pages)
+
+
+def warm_engines(cfg: ForgeConfig) -> None:
     """
-    Lightweight table quality score to compare CSVs:
-      score ~ (rows * cols) / (1 + 10 * empty_fraction)
-    Falls back to 0.0 if pandas or file load fails.
+    Load heavy engines up front so a long-lived worker pays for them once.
+    With --ocr auto the DeepSeek model stays lazy: native-only corpora never need it.
     """
+    warm = []
+    if cfg.ocr_engine in ("deepseek", "tesseract"):
+        warm.append(("warm:deepseek", {"precision": cfg.ocr_precision}))
+    if cfg.tables in ("auto", "docling") or cfg.text_engine == "docling":
+        warm.append(("warm:docling", {}))
+    for key, kw in warm:
+        fn = engines.get(key)
+        try:
+            if fn is not None: fn(**kw)
+        except Exception:
+            pass
+    if cfg.lang_detector in ("auto", "ngram"):
+        from .postprocess.ngram_lang import get_model
+        get_model()
+
+
+def _load_json(path: str):
     try:
-        import pandas as pd
-        df = pd.read_csv(csv_path)
-        if df.empty:
-            return 0.0
-        r, c = df.shape
-        empties = df.isna().mean().mean()
-        return (r * c) / (1.0 + 10.0 * float(empties))
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
     except Exception:
-        return 0.0
+        return None
 
 
-def run_on_pdf(path: str, outdir: str, cfg: ForgeConfig) -> Dict:
-    doc_id = ingest_io.sha256_of_file(path)[:16]
+def stage_route(job: DocJob, cfg: ForgeConfig, manifest: Optional[RunManifest] = None) -> None:
+    """Hash, resume check and router. Sets job.result when the document can be skipped."""
+    # One mapped read of the file serves the hash, fitz, OCR rendering and Docling
+    if job.session is None:
+        job.session = DocSession(job.path, cache_text=(cfg.stream_post != "on"))
+    with span("route.hash"):
+        job.sha256 = manifest.content_hash(job.path, job.session) if manifest else job.session.sha256
+    job.doc_id = job.sha256[:16]
+    base = _doc_dir(job, cfg)
+    job.stages = stage_fingerprints(cfg)
+
+    # Resume: skip documents whose content and stage configs are unchanged
+    prev = manifest.lookup(job.sha256) if manifest else None
+    if prev and prev.get("stages") == job.stages and _output_exists(prev, base):
+        job.result = dict(prev["result"], sha256=job.sha256, stages=job.stages, skipped=True)
+        return
+    job.prev = prev
+    same_extract = bool(prev) and prev["stages"].get("extract") == job.stages["extract"]
+    cached = _load_json(os.path.join(base, RAW_PAGES_NAME)) if same_extract else None
+    if cached is not None and "spill" in cached and not os.path.exists(os.path.join(base, cached["spill"]["file"])):
+        cached = None
+    if cached is not None:
+        job.extracted = cached
+        return
 
     # Router (OCR vs non-OCR)
-    probe = build_probe(path, max_pages=cfg.max_pages_probe)
+    with span("route.probe"):
+        probe = build_probe(job.session, max_pages=cfg.max_pages_probe)
+    if _streaming(cfg, probe.num_pages):
+        job.session.cache_text = False  # pages go straight to the spill file
     routed_choice = route_mode(probe, min_text_ratio=cfg.min_text_page_ratio)
     use_ocr = (routed_choice == "ocr")
     route_reason = f"router_{routed_choice}"
 
-    # Honor CLI flags / availability
+    # Honor CLI flags / availability (checked without importing the engine)
+    engine = _ocr_available(cfg)
     if cfg.ocr_engine == "off":
         use_ocr = False
         route_reason = "ocr_disabled_by_flag"
     elif cfg.ocr_engine == "deepseek":
-        if ocr_pages_deepseek is None:
+        if not engine:
             use_ocr = False
             route_reason = "deepseek_missing"
         else:
@@ -76,96 +206,338 @@ def run_on_pdf(path: str, outdir: str, cfg: ForgeConfig) -> Dict:
             route_reason = "forced_deepseek"
     elif cfg.ocr_engine == "tesseract":
         # In this build we reuse DeepSeek wrapper for OCR; if missing, skip OCR.
-        if ocr_pages_deepseek is None:
+        if not engine:
             use_ocr = False
             route_reason = "tesseract_unavailable"
         else:
             use_ocr = True
             route_reason = "tesseract_unavailable_used_deepseek"
     else:
-        if use_ocr and ocr_pages_deepseek is None:
+        if use_ocr and not engine:
             use_ocr = False
             route_reason = "ocr_engine_missing"
 
-    # Extract text
+    granularity = "document"
+    if cfg.text_engine == "docling":
+        # Docling's own pipeline produces text (and tables) for every page in one convert()
+        granularity = "docling"
+        use_ocr = False
+        route_reason = "text_engine_docling"
+    elif cfg.route_granularity == "page" and cfg.ocr_engine in ("auto", "stub") and engine:
+        # Real decision happens per page at extraction; the probe only picks the lane.
+        granularity = "page"
+        use_ocr = needs_ocr_hint(probe)
+        route_reason = "router_page"
+
+    job.use_ocr = use_ocr
+    job.extracted = {
+        "routed": "ocr" if use_ocr else "non_ocr",
+        "route_reason": route_reason,
+        "granularity": granularity,
+        "probe": {
+            "num_pages": probe.num_pages,
+            "text_page_ratio": probe.text_page_ratio,
+            "text_pages_sampled": probe.text_pages,
+            "max_img_dpi": round(max((p.img_dpi for p in probe.pages), default=0.0), 1),
+        },
+    }
+
+
+def _ocr_key(cfg: ForgeConfig) -> str:
+    """Registry key of the OCR engine for cfg.ocr_engine; stub routes like auto."""
+    return "ocr:stub" if cfg.ocr_engine == "stub" else "ocr:deepseek"
+
+
+def _ocr_available(cfg: ForgeConfig) -> bool:
+    return engines.available(_ocr_key(cfg))
+
+
+def _ocr(path, cfg: ForgeConfig, pages: Optional[List[int]] = None) -> List[str]:
+    kw = {"ms_per_page": cfg.ocr_stub_ms} if cfg.ocr_engine == "stub" else {"precision": cfg.ocr_precision}
+    engine = engines.get(_ocr_key(cfg))  # first OCR page of the process pays the import
+    if engine is None:
+        # Installed but failed to import: keep the text layer rather than fail the document
+        texts = extract_text_pymupdf(path)
+        return texts if pages is None else [texts[i] for i in pages]
+    with span("extract.ocr"):
+        return engine(path, dpi=cfg.ocr_dpi or None, max_dpi=cfg.ocr_max_dpi, prompt_mode=cfg.deepseek_prompt,
+                      batch_size=cfg.ocr_batch_size, batch_wait_ms=cfg.ocr_batch_wait_ms, pages=pages, **kw)
+
+
+def stage_extract(job: DocJob, cfg: ForgeConfig, manifest: Optional[RunManifest] = None) -> None:
+    """Native or OCR text extraction (no-op when raw pages came from the resume cache)."""
+    ex = job.extracted
+    if "pages" in ex or "spill" in ex:
+        return
+    stream = _streaming(cfg, ex["probe"]["num_pages"])
+    spill_path = os.path.join(_doc_dir(job, cfg), SPILL_NAME)
     page_markdowns = None
-    if use_ocr:
-        pages = ocr_pages_deepseek(path, prompt_mode=cfg.deepseek_prompt) if ocr_pages_deepseek else extract_text_pymupdf(path)
-        routed = "ocr"
+    if ex.get("granularity") == "docling":
+        convert_docling = engines.get("text:docling")
+        if convert_docling is None:
+            raise RuntimeError(f"docling text engine unavailable: {engines.import_stats()['text:docling']['error']}")
+        from .tables.docling_tables import docling_page_texts
+        with span("extract.docling"):
+            job.docling_doc = convert_docling(job.session)
+        pages = docling_page_texts(job.docling_doc, len(job.session))
+        ex["routed"] = "non_ocr"
+    elif ex.get("granularity") == "page":
+        # Text layer where it exists, DeepSeek only for pages without one, merged in page order
+        routes: List[str] = []
+        def native():
+            for i, t in enumerate(iter_text_pymupdf(job.session)):
+                routes.extend(route_pages([t], [len(job.session.page_images(i))]))
+                yield t
+        pages = PageSpill.write(spill_path, native()) if stream else list(native())
+        idx = [i for i, r in enumerate(routes) if r == "ocr"]
+        if idx:
+            ocr = _ocr(job.session, cfg, pages=idx)
+            if stream:
+                pages.patch(dict(zip(idx, ocr)))
+            else:
+                for i, t in zip(idx, ocr):
+                    pages[i] = t
+            if cfg.deepseek_prompt == "markdown":
+                page_markdowns = [""] * len(routes)
+                for i, t in zip(idx, ocr):
+                    page_markdowns[i] = t
+        ex["routed"] = "non_ocr" if not idx else ("ocr" if len(idx) == len(routes) else "hybrid")
+        ex["page_routes"] = routes
+    elif job.use_ocr:
+        pages = _ocr(job.session, cfg) if _ocr_available(cfg) else extract_text_pymupdf(job.session)
         if cfg.deepseek_prompt == "markdown":
             page_markdowns = pages[:]
     else:
-        pages = extract_text_pymupdf(path)
-        routed = "non_ocr"
+        pages = iter_text_pymupdf(job.session) if stream else extract_text_pymupdf(job.session)
+    if ex["routed"] != "non_ocr" and cfg.ocr_engine != "stub" and engines.available("precision:deepseek"):
+        # What the model really runs in: bf16 falls back to fp32 on CPUs without native support
+        loaded = engines.get("precision:deepseek")
+        precision = loaded() if loaded is not None else None
+        if precision:
+            ex["ocr_precision"] = precision
+    if stream and not isinstance(pages, PageSpill):
+        pages = PageSpill.write(spill_path, pages)
+    if isinstance(pages, PageSpill):
+        ex["spill"] = dict(pages.meta(), keep=_keep_raw(cfg, ex, manifest))
+    else:
+        ex["pages"] = pages
+    ex["page_markdowns"] = page_markdowns
+    if _keep_raw(cfg, ex, manifest):
+        # Raw (pre-postprocess) pages let a later run with a changed tables/post
+        # config skip OCR entirely.
+        ingest_io.write_json(os.path.join(_doc_dir(job, cfg), RAW_PAGES_NAME), ex)
+
+
+def _tables(name: str):
+    """Table engine by name, imported on first use; a stand-in reporting the error when it cannot load."""
+    fn = engines.get(f"tables:{name}")
+    if fn is not None:
+        return fn
+    err = engines.import_stats()[f"tables:{name}"]["error"]
+    return lambda *a, **kw: {"engine": name, "error": err, "count": 0, "best_score": 0.0, "tables": []}
+
+
+def _heavy_table_cascade(job: DocJob, cfg: ForgeConfig, page_range, cam_pages: str, md_pages) -> Dict:
+    """Docling → OCR markdown → Camelot, first engine with any table wins."""
+    path, routed, page_markdowns = job.path, job.extracted["routed"], job.extracted["page_markdowns"]
+    # Docling first
+    try:
+        with span("tables.docling"):
+            table_meta = _tables("docling")(job.session or path, page_range=page_range)
+    except Exception as e:
+        table_meta = {"engine": "docling", "error": str(e), "count": 0, "tables": []}
+
+    # If Docling found nothing and we have OCR markdown pages, try MD parser
+    if table_meta.get("count", 0) == 0 and routed in ("ocr", "hybrid") and page_markdowns and cfg.deepseek_prompt == "markdown":
+        with span("tables.markdown"):
+            md_meta = _tables("markdown")(page_markdowns, pages=md_pages)
+        if md_meta.get("count", 0) > 0:
+            table_meta = md_meta
 
-    # 4) Tables (do early on the original PDF / OCR markdown)
-    table_meta = {"engine": None, "count": 0, "items": []}
-    tdir = os.path.join(outdir, doc_id, "tables")
+    # If still nothing, try Camelot as last resort
+    if table_meta.get("count", 0) == 0:
+        with span("tables.camelot"):
+            cm = _tables("camelot")(path, pages=cam_pages)
+        if cm.get("count", 0) > 0:
+            table_meta = cm
+    return table_meta
 
-    if cfg.tables != "off":
-        if cfg.tables == "camelot":
+
+def stage_tables(job: DocJob, cfg: ForgeConfig) -> None:
+    path, doc_id, outdir, prev = job.path, job.doc_id, job.outdir, job.prev
+    routed = job.extracted["routed"]
+    page_markdowns = job.extracted["page_markdowns"]
+
+    # 4) Tables (do early on the original PDF / OCR markdown); kept in memory until stage_post
+    table_meta = {"engine": None, "count": 0, "tables": []}
+    prev_meta = None
+    if prev and prev["stages"].get("tables") == job.stages["tables"] and prev["stages"].get("extract") == job.stages["extract"]:
+        prev_meta = _prev_docmeta(prev, _doc_dir(job, cfg))
+
+    if prev_meta is not None:
+        table_meta = prev_meta.get("meta", {}).get("tables", table_meta)
+    elif job.docling_doc is not None and cfg.tables in ("auto", "docling"):
+        # Tables from the same convert() that produced the text; no second parse, no cascade
+        try:
+            table_meta = _tables("docling")(job.session, doc=job.docling_doc)
+        except Exception as e:
+            table_meta = {"engine": "docling", "error": str(e), "count": 0, "tables": []}
+    elif cfg.tables != "off":
+        if cfg.tables == "pymupdf":
+            table_meta = _tables("pymupdf")(job.session)
+
+        elif cfg.tables == "camelot":
             # Explicit Camelot mode, regardless of route
-            table_meta = extract_tables_camelot(path, tdir)
+            table_meta = _tables("camelot")(path)
 
         elif cfg.tables == "docling":
             # Docling only
             try:
-                table_meta = extract_tables_docling(path, tdir)
+                table_meta = _tables("docling")(job.session or path)
             except Exception as e:
-                table_meta = {"engine": "docling", "error": str(e), "count": 0, "items": []}
+                table_meta = {"engine": "docling", "error": str(e), "count": 0, "tables": []}
 
         elif cfg.tables == "auto":
-            # Docling first
-            try:
-                table_meta = extract_tables_docling(path, tdir)
-            except Exception as e:
-                table_meta = {"engine": "docling", "error": str(e), "count": 0, "items": []}
+            # Cheap per-page pre-pass: run the cascade only on likely table pages, or not at all
+            gate, cand = None, None
+            if cfg.table_gate:
+                with span("tables.gate"):
+                    scores = page_table_scores(job.session, page_markdowns)
+                cand = candidate_pages(scores, cfg.table_gate_threshold)
+                gate = {"candidates": cand, "max_score": round(max(scores, default=0.0), 3)}
 
-            # If Docling found nothing and we have OCR markdown pages, try MD parser
-            if table_meta.get("count", 0) == 0 and routed == "ocr" and page_markdowns and cfg.deepseek_prompt == "markdown":
-                md_meta = extract_tables_from_markdown_pages(page_markdowns, tdir)
-                if md_meta.get("count", 0) > 0:
-                    table_meta = md_meta
+            if cand is not None and not cand:
+                table_meta = {"engine": None, "count": 0, "tables": []}
+            else:
+                page_range = (cand[0], cand[-1]) if cand else None
+                cam_pages = ",".join(map(str, cand)) if cand else "all"
+                md_pages = set(cand) if cand else None
 
-            # If still nothing, try Camelot as last resort
-            if table_meta.get("count", 0) == 0:
-                cm = extract_tables_camelot(path, tdir)
-                if cm.get("count", 0) > 0:
-                    table_meta = cm
+                # PyMuPDF's table finder first; escalate only when it scores poorly
+                try:
+                    with span("tables.pymupdf"):
+                        table_meta = _tables("pymupdf")(job.session, pages=cand)
+                except Exception as e:
+                    table_meta = {"engine": "pymupdf", "error": str(e), "count": 0, "best_score": 0.0, "tables": []}
+                if table_meta["count"] == 0 or table_meta["best_score"] < cfg.table_min_score:
+                    heavy = _heavy_table_cascade(job, cfg, page_range, cam_pages, md_pages)
+                    if heavy.get("count", 0) > 0 or table_meta["count"] == 0:
+                        heavy["escalated_from"] = {"engine": "pymupdf", "count": table_meta["count"],
+                                                   "best_score": table_meta["best_score"]}
+                        table_meta = heavy
+            if gate is not None:
+                table_meta["gate"] = gate
+
+    job.table_meta = table_meta
+
+
+def _page_spill(job: DocJob, base: str) -> PageSpill:
+    ex, path = job.extracted, os.path.join(base, SPILL_NAME)
+    if "spill" in ex:
+        return PageSpill(path, ex["spill"]["pages"], ex["spill"]["lines"])
+    return PageSpill.write(path, ex["pages"])  # in-memory pages from an older resume cache
+
+
+def _stream_pages(job: DocJob, cfg: ForgeConfig, base: str, acc: Dict) -> Iterator[str]:
+    """Streaming post chain: writes text.txt (and page_text/, record slices) page by page, yields cleaned pages."""
+    spill = _page_spill(job, base)
+    pdir = os.path.join(base, "page_text") if cfg.save_pages and cfg.output != "shards" else None
+    if pdir:
+        _ensure_dir(pdir)
+    offs, cur, tongues = acc["page_offsets"], 0, acc["tongues"]
+    with open(os.path.join(base, "text.txt"), "w", encoding="utf-8") as tf, \
+         (open(acc["slices"], "w", encoding="utf-8") if acc.get("slices") else nullcontext()) as sf:
+        for i, (s, c) in enumerate(stream_post(PostChain(), spill), 1):
+            tf.write(c)
+            offs.append(cur)
+            cur += len(c)
+            if tongues is not None:
+                tongues.feed(c)
+            if pdir:
+                ingest_io.write_text(os.path.join(pdir, f"{i:04d}.txt"), s)
+            if sf:
+                sf.write(json.dumps(s, ensure_ascii=False) + "\n")
+            yield c
+    if not job.extracted.get("spill", {}).get("keep"):
+        os.remove(spill.path)
+
+
+@contextmanager
+def _chunk_sink(cfg: ForgeConfig, head: Dict, tokenizer, path: Optional[str] = None):
+    """Chunker appending `head`-prefixed records to `path` as chunks complete (kept in .chunks
+    without a path); None when chunking is off."""
+    if cfg.chunk_tokens <= 0:
+        yield None
+        return
+    with (open(path, "w", encoding="utf-8") if path else nullcontext()) as f:
+        emit = (lambda c: f.write(json.dumps(dict(head, **c), ensure_ascii=False) + "\n")) if f else None
+        chunker = Chunker(tokenizer, cfg.chunk_tokens, cfg.chunk_overlap, emit=emit)
+        yield chunker
+        chunker.close()
+
+
+def _tongues(cfg: ForgeConfig) -> Optional[PageTongues]:
+    if cfg.lang_detector == "off":
+        return None
+    return PageTongues("langdetect" if cfg.lang_detector == "langdetect" else "ngram")
+
+
+def _token_meta(tokenizer, page_tokens: List[int], chunker) -> Dict:
+    meta = {"page_tokens": page_tokens, "tokenizer": tokenizer.name}
+    if chunker is not None:
+        meta["chunks"] = {"count": chunker.n, "max_tokens": chunker.max_tokens, "overlap": chunker.overlap}
+    return meta
+
+
+def _shards(cfg: ForgeConfig, outdir: str):
+    return get_writer(outdir, max_bytes=int(cfg.shard_max_mb * (1 << 20)), compress=cfg.shard_gzip)
 
-    # Compute a simple "best table" score (optional, helpful for benchmarking)
-    try:
-        best_csv, best_score = None, 0.0
-        for it in table_meta.get("items", []):
-            csv = it.get("path_csv")
-            if not csv:
-                continue
-            s = _score_csv_table(csv)
-            if s > best_score:
-                best_score, best_csv = s, csv
-        if best_csv:
-            table_meta["best_csv"] = best_csv
-            table_meta["best_score"] = round(best_score, 3)
-    except Exception:
-        pass
-
-    # 5) Pre/Post chain
-    wiper = PageTagWiper()
-    skimmer = BoilerSkim()
-    welder = ParaWeld()
-    marker = MarklistNormalizer()
-
-    pages = wiper.strip_headers_footers(pages, 2, 2, 0.45, 3)
-    pages = skimmer.drop(pages)
-    pages = [welder.fuse(p) for p in pages]
-    pages = [marker.normalize(p) for p in pages]
-    text, page_offsets = _concat_with_offsets([wiper.remove_page_labels(p) for p in pages])
-
-    # Lang + tokens
-    tongue = TongueTagger() if cfg.lang_detector == "auto" else None
-    language = tongue.guess(text) if tongue else None
-    meter = TokenMeter()
-    token_count = meter.count(text)
+
+def _result(job: DocJob, out: str, routed: str, language: str, token_count: int, loc: Optional[Dict] = None) -> Dict:
+    result = {"doc_id": job.doc_id, "out": out, "routed": routed, "pages": job.extracted["probe"]["num_pages"],
+              "language": language, "token_count": token_count, "sha256": job.sha256, "stages": job.stages}
+    if loc is not None:
+        result.update(offset=loc["offset"], length=loc["length"])
+    job.result = result
+    return result
+
+
+def stage_post(job: DocJob, cfg: ForgeConfig) -> Dict:
+    """Post-processing chain, language, tokens and output files. Sets job.result."""
+    doc_id, outdir, extracted = job.doc_id, job.outdir, job.extracted
+    routed = extracted["routed"]
+    shards = cfg.output == "shards"
+    base = _doc_dir(job, cfg)
+
+    # Tables are written exactly once, here; nothing reads them back (shards: always columnar)
+    with span("post.tables"):
+        table_meta = finalize_tables(job.table_meta, doc_id, os.path.join(base, "tables"), outdir,
+                                     "columnar" if shards else cfg.table_format, cfg.table_roll_secs)
+
+    if _streaming(cfg, extracted["probe"]["num_pages"]):
+        return _stage_post_stream(job, cfg, table_meta)
+    pages = list(extracted["pages"]) if "pages" in extracted else list(_page_spill(job, base))
+
+    # 5) Pre/Post chain (fused; same output as PageTagWiper → BoilerSkim → ParaWeld → MarklistNormalizer → labels)
+    with span("post.chain"):
+        pages, cleaned = PostChain().run(pages)
+        text, page_offsets = _concat_with_offsets(cleaned)
+
+    if not shards:
+        _ensure_dir(base)
+
+    # Lang + tokens (per page, in the same pass as chunking)
+    language, lang_meta = None, {}
+    with span("post.lang"):
+        tongues = _tongues(cfg)  # the first call in a process loads the n-gram model
+        if tongues is not None:
+            for c in cleaned:
+                tongues.feed(c)
+            language, lang_meta = tongues.result()
+    tokenizer = get_tokenizer(cfg.tokenizer)
+    with span("post.tokens"), \
+         _chunk_sink(cfg, {"doc_id": doc_id}, tokenizer, None if shards else os.path.join(base, "chunks.jsonl")) as chunker:
+        page_tokens, token_count = TokenMeter(tokenizer).page_counts(cleaned, chunker.feed if chunker else None)
 
     bundle = DocBundle(
         doc_id=doc_id,
@@ -175,27 +547,38 @@ def run_on_pdf(path: str, outdir: str, cfg: ForgeConfig) -> Dict:
         routed=routed,
         language=language or "unknown",
         meta={
-            "probe": {
-                "num_pages": probe.num_pages,
-                "text_page_ratio": probe.text_page_ratio,
-                "text_pages_sampled": probe.text_pages,
-            },
-            "route_reason": route_reason,
+            "probe": extracted["probe"],
+            "route_reason": extracted["route_reason"],
+            **({"page_routes": extracted["page_routes"]} if extracted.get("page_routes") else {}),
+            **({"ocr_precision": extracted["ocr_precision"]} if extracted.get("ocr_precision") else {}),
+            **lang_meta,
             "token_count": token_count,
+            **_token_meta(tokenizer, page_tokens, chunker),
             "tables": table_meta,
+            "timings": job.spans.as_dict() if job.spans else {},
         },
     )
 
-    # Write outputs
-    base = os.path.join(outdir, doc_id)
-    _ensure_dir(base)
-    ingest_io.write_text(os.path.join(base, "text.txt"), text)
+    if shards:
+        # One block per document: doc record, then page and chunk records
+        recs = [{"type": "doc", "doc_id": doc_id, "text": text, "page_offsets": page_offsets, "routed": routed,
+                 "language": bundle.language, "meta": bundle.meta}]
+        if cfg.save_pages:
+            recs += [{"type": "page", "doc_id": doc_id, "page": i, "text": p} for i, p in enumerate(pages, 1)]
+        if chunker is not None:
+            recs += [dict(type="chunk", doc_id=doc_id, **c) for c in chunker.chunks]
+        with span("post.write"):
+            loc = _shards(cfg, outdir).write(doc_id, recs)
+        return _result(job, loc["shard"], routed, bundle.language, token_count, loc)
 
-    if cfg.save_pages:
-        pdir = os.path.join(base, "page_text")
-        _ensure_dir(pdir)
-        for i, p in enumerate(pages, 1):
-            ingest_io.write_text(os.path.join(pdir, f"{i:04d}.txt"), p)
+    # Write outputs
+    with span("post.write"):
+        ingest_io.write_text(os.path.join(base, "text.txt"), text)
+        if cfg.save_pages:
+            pdir = os.path.join(base, "page_text")
+            _ensure_dir(pdir)
+            for i, p in enumerate(pages, 1):
+                ingest_io.write_text(os.path.join(pdir, f"{i:04d}.txt"), p)
 
     ingest_io.write_json(
         os.path.join(base, "docmeta.json"),
@@ -209,6 +592,80 @@ def run_on_pdf(path: str, outdir: str, cfg: ForgeConfig) -> Dict:
     )
 
     if cfg.keep_jsonl:
-        ingest_io.write_text(os.path.join(base, "record.jsonl"), f"{asdict(bundle)}\n")
+        ingest_io.write_text(os.path.join(base, "record.jsonl"), json.dumps(asdict(bundle), ensure_ascii=False) + "\n")
+
+    return _result(job, base, routed, bundle.language, token_count)
+
+
+def _stage_post_stream(job: DocJob, cfg: ForgeConfig, table_meta: Dict) -> Dict:
+    """stage_post in bounded memory: same output, never holding the document's pages or text."""
+    doc_id, extracted = job.doc_id, job.extracted
+    shards = cfg.output == "shards"
+    base = _doc_dir(job, cfg)
+    _ensure_dir(base)
+    want_slices = cfg.save_pages if shards else cfg.keep_jsonl
+    with span("post.lang"):
+        tongues = _tongues(cfg)
+    acc = {"page_offsets": [], "tongues": tongues, "slices": os.path.join(base, ".page_slices.jsonl") if want_slices else None}
+    chunk_path = os.path.join(base, ".chunks.jsonl" if shards else "chunks.jsonl")
+    tokenizer = get_tokenizer(cfg.tokenizer)
+    head = {"type": "chunk", "doc_id": doc_id} if shards else {"doc_id": doc_id}
+    with span("post.stream"), _chunk_sink(cfg, head, tokenizer, chunk_path) as chunker:
+        page_tokens, token_count = TokenMeter(tokenizer).page_counts(_stream_pages(job, cfg, base, acc), chunker.feed if chunker else None)
+    language, lang_meta = acc["tongues"].result() if acc["tongues"] is not None else (None, {})
+    language = language or "unknown"
+    meta = {
+        "probe": extracted["probe"],
+        "route_reason": extracted["route_reason"],
+        **({"page_routes": extracted["page_routes"]} if extracted.get("page_routes") else {}),
+        **({"ocr_precision": extracted["ocr_precision"]} if extracted.get("ocr_precision") else {}),
+        **lang_meta,
+        "token_count": token_count,
+        **_token_meta(tokenizer, page_tokens, chunker),
+        "tables": table_meta,
+        "timings": job.spans.as_dict() if job.spans else {},
+    }
+    text_path = os.path.join(base, "text.txt")
+    record = {"doc_id": doc_id, "routed": extracted["routed"], "language": language, "page_offsets": acc["page_offsets"], "meta": meta}
+
+    if shards:
+        # Assemble the block on disk (text, pages and chunks are copied, never loaded), then hand it to the writer
+        writer = _shards(cfg, job.outdir)
+        block = os.path.join(base, ".block")
+        with span("post.write"), writer.open_block(block) as f:
+            ingest_io.write_record(f, {"type": "doc", "doc_id": doc_id, "text": ingest_io.FromFile(text_path),
+                                       **{k: record[k] for k in ("page_offsets", "routed", "language", "meta")}})
+            if acc["slices"]:
+                with open(acc["slices"], "r", encoding="utf-8") as sf:
+                    for i, line in enumerate(sf, 1):
+                        f.write('{"type": "page", "doc_id": %s, "page": %d, "text": %s}\n' % (json.dumps(doc_id), i, line.rstrip("\n")))
+            if chunker is not None:
+                with open(chunk_path, "r", encoding="utf-8") as cf:
+                    shutil.copyfileobj(cf, f)
+        for p in (text_path, acc["slices"], chunk_path if chunker is not None else None):
+            if p: os.remove(p)
+        loc = writer.write_file(doc_id, block)  # the writer removes the block (and the empty scratch dir)
+        return _result(job, loc["shard"], extracted["routed"], language, token_count, loc)
+
+    ingest_io.write_json(os.path.join(base, "docmeta.json"), record)
+    if cfg.keep_jsonl:
+        with open(os.path.join(base, "record.jsonl"), "w", encoding="utf-8") as f:
+            ingest_io.write_record(f, {"doc_id": doc_id, "text": ingest_io.FromFile(text_path),
+                                       "page_slices": ingest_io.FromFile(acc["slices"], "lines"),
+                                       **{k: record[k] for k in ("page_offsets", "routed", "language", "meta")}})
+        os.remove(acc["slices"])
+    return _result(job, base, extracted["routed"], language, token_count)
+
+
+def run_on_pdf(path: str, outdir: str, cfg: ForgeConfig, manifest: Optional[RunManifest] = None) -> Dict:
+    job = new_job(path, outdir, cfg)
+    try:
+        run_stage("route", stage_route, job, cfg, manifest)
+        if job.result is not None:
+            return job.result
+        run_stage("extract", stage_extract, job, cfg, manifest)
+        run_stage("tables", stage_tables, job, cfg)
+        return run_stage("post", stage_post, job, cfg)
+    finally:
+        finish_job(job)
 
-    return {"doc_id": doc_id, "out": base, "routed": routed, "language": language or "unknown", "token_count": token_count}
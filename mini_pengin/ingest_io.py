@@ -1,12 +1,24 @@
 import os, hashlib, json
 
 def iter_pdf_paths(root: str):
+    """PDFs under root (or root itself), streamed in os.walk's top-down order; one directory listing at a time."""
     if os.path.isfile(root) and root.lower().endswith(".pdf"):
         yield root; return
-    for base, _, files in os.walk(root):
-        for name in files:
-            if name.lower().endswith(".pdf"):
-                yield os.path.join(base, name)
+    stack = [root]
+    while stack:
+        subdirs = []
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False): subdirs.append(e.path)
+                    elif e.name.lower().endswith(".pdf") and e.is_file(): yield e.path
+                except OSError:
+                    pass
+        stack.extend(reversed(subdirs))
 
 def sha256_of_file(path: str) -> str:
     h = hashlib.sha256()
@@ -24,3 +36,31 @@ def write_json(path: str, data) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+
+class FromFile:
+    """A record value kept on disk: kind "text" dumps the file as one JSON string, "lines" a JSONL file as a JSON array."""
+    def __init__(self, path: str, kind: str = "text"):
+        self.path, self.kind = path, kind
+
+    def dump(self, f) -> None:
+        if self.kind == "text":
+            f.write('"')
+            with open(self.path, "r", encoding="utf-8", newline="") as src:
+                for chunk in iter(lambda: src.read(1 << 20), ""):
+                    f.write(json.dumps(chunk, ensure_ascii=False)[1:-1])
+            f.write('"')
+            return
+        f.write("[")
+        with open(self.path, "r", encoding="utf-8") as src:
+            for k, line in enumerate(src):
+                f.write((", " if k else "") + line.rstrip("\n"))
+        f.write("]")
+
+def write_record(f, record: dict) -> None:
+    """One JSONL line, byte-identical to json.dumps(record, ensure_ascii=False), streaming FromFile values."""
+    f.write("{")
+    for k, (key, v) in enumerate(record.items()):
+        f.write((", " if k else "") + json.dumps(key) + ": ")
+        if isinstance(v, FromFile): v.dump(f)
+        else: f.write(json.dumps(v, ensure_ascii=False))
+    f.write("}\n")
@@ -0,0 +1,92 @@
+import queue, threading
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from .config import ForgeConfig
+from .schemas import DocJob
+from .run_manifest import RunManifest
+from .forge_runner import stage_route, stage_extract, stage_tables, stage_post, run_stage, new_job, finish_job
+
+LANES = ("route", "native", "ocr", "tables", "post")
+
+def lane_sizes(cfg: ForgeConfig) -> Dict[str, int]:
+    """Default lane concurrency, overridden per lane by cfg.lane_workers."""
+    w = max(1, cfg.workers)
+    sizes = {"route": 1, "native": w, "ocr": 1, "tables": max(1, w // 2), "post": w}
+    sizes.update({k: max(1, int(v)) for k, v in (cfg.lane_workers or {}).items() if k in sizes})
+    return sizes
+
+def parse_lane_workers(spec: Optional[str]) -> Dict[str, int]:
+    """'native=8,ocr=1' -> {'native': 8, 'ocr': 1}"""
+    out: Dict[str, int] = {}
+    for part in (spec or "").split(","):
+        if not part.strip(): continue
+        k, _, v = part.partition("=")
+        if k.strip() not in LANES: raise ValueError(f"unknown lane: {k.strip()}")
+        out[k.strip()] = int(v)
+    return out
+
+class LanePipeline:
+    """
+    Router first, then separately sized lanes joined by bounded queues:
+      route -> native | ocr -> tables -> post
+    Slow OCR documents only occupy the ocr lane, so native PDFs keep flowing.
+    A full downstream queue blocks its producer (backpressure), bounding memory.
+    """
+    def __init__(self, outdir: str, cfg: ForgeConfig, manifest: Optional[RunManifest] = None):
+        self.outdir, self.cfg, self.manifest = outdir, cfg, manifest
+        self.sizes = lane_sizes(cfg)
+        self.q = {lane: queue.Queue(maxsize=max(1, cfg.lane_queue)) for lane in LANES}
+        self.out: "queue.Queue[Tuple[str, object]]" = queue.Queue()
+
+    def _step(self, lane: str, job: DocJob) -> Optional[str]:
+        cfg, manifest = self.cfg, self.manifest
+        if lane == "route":
+            run_stage("route", stage_route, job, cfg, manifest)
+            if job.result is not None: return None
+            if "pages" in job.extracted or "spill" in job.extracted: return "tables"
+            return "ocr" if job.use_ocr else "native"
+        if lane in ("native", "ocr"):
+            run_stage("extract", stage_extract, job, cfg, manifest); return "tables"
+        if lane == "tables":
+            run_stage("tables", stage_tables, job, cfg); return "post"
+        run_stage("post", stage_post, job, cfg); return None
+
+    def _worker(self, lane: str) -> None:
+        q = self.q[lane]
+        while True:
+            job = q.get()
+            if job is None: return
+            try:
+                nxt = self._step(lane, job)
+            except Exception as e:
+                finish_job(job); self.out.put((job.path, e)); continue
+            if nxt is None: finish_job(job); self.out.put((job.path, job.result))
+            else: self.q[nxt].put(job)
+
+    def run(self, paths: Iterable[str]) -> Iterator[Tuple[str, object]]:
+        """Yields (path, result dict | Exception) as documents finish, in completion order."""
+        threads = [threading.Thread(target=self._worker, args=(lane,), daemon=True, name=f"lane-{lane}-{i}")
+                   for lane in LANES for i in range(self.sizes[lane])]
+        for t in threads: t.start()
+        fed = {"n": 0, "done": False, "error": None}
+        def feed():
+            try:
+                for p in paths:
+                    self.q["route"].put(new_job(p, self.outdir, self.cfg)); fed["n"] += 1
+            except BaseException as e:
+                fed["error"] = e  # discovery failed: finish what was fed, then raise in the consumer
+            finally:
+                fed["done"] = True
+                self.out.put(None)  # wake the consumer so it sees the final count
+        threading.Thread(target=feed, daemon=True, name="lane-feed").start()
+        seen = 0
+        try:
+            while not (fed["done"] and seen >= fed["n"]):
+                item = self.out.get()
+                if item is None: continue
+                seen += 1
+                yield item
+            if fed["error"] is not None:
+                raise fed["error"]
+        finally:
+            for lane in LANES:
+                for _ in range(self.sizes[lane]): self.q[lane].put(None)
@@ -0,0 +1,49 @@
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+class Chunker:
+    """
+    Token-budgeted chunks over the cleaned pages of one document, fed in order.
+    Each chunk holds up to max_tokens tokens and repeats the last `overlap`
+    tokens of the previous one. start/end are character offsets into text.txt,
+    and page_start/page_end are 1-based. feed() returns the page's token count,
+    so chunking and per-page token counting share one tokenizer pass.
+    Only the current window's text is buffered, so pages can be streamed.
+    """
+    def __init__(self, tokenizer, max_tokens: int, overlap: int = 0, emit: Optional[Callable[[Dict], None]] = None):
+        self.tok, self.max_tokens = tokenizer, max(1, max_tokens)
+        self.overlap = max(0, min(overlap, self.max_tokens - 1))
+        self.chunks: List[Dict] = []
+        self.emit = emit or self.chunks.append
+        self.win: deque = deque()        # (start, end, page) per token in the current window
+        self.buf, self.buf_start = "", 0  # text from buf_start up to the end of the last fed page
+        self.offset = self.page = self.n = 0
+
+    def feed(self, text: str) -> int:
+        self.page += 1
+        base, k = self.offset, 0
+        self.buf += text
+        self.offset += len(text)
+        for s, e in self.tok.spans(text):
+            self.win.append((base + s, base + e, self.page)); k += 1
+            if len(self.win) == self.max_tokens:
+                self._flush()
+        return k
+
+    def close(self) -> None:
+        # a trailing window with nothing but the previous chunk's overlap adds no text
+        if self.win and (self.n == 0 or len(self.win) > self.overlap):
+            self._flush(final=True)
+
+    def _flush(self, final: bool = False) -> None:
+        w = self.win
+        start, end = w[0][0], w[-1][1]
+        self.emit({"chunk": self.n, "start": start, "end": end, "page_start": w[0][2], "page_end": w[-1][2],
+                   "tokens": len(w), "text": self.buf[start - self.buf_start:end - self.buf_start]})
+        self.n += 1
+        if final:
+            w.clear(); return
+        for _ in range(len(w) - self.overlap):
+            w.popleft()
+        cut = (w[0][0] if w else end) - self.buf_start
+        self.buf, self.buf_start = self.buf[cut:], self.buf_start + cut
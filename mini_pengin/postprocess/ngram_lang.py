@@ -0,0 +1,94 @@
+import os, json, math, threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import langdetect
+    from langdetect.utils.ngram import NGram
+    PROFILES = os.path.join(os.path.dirname(langdetect.__file__), "profiles")
+except Exception:
+    NGram, PROFILES = None, None
+
+SMOOTH = 5e-5  # langdetect's ALPHA / BASE_FREQ: probability mass of an unseen n-gram
+
+class NgramLangID:
+    """
+    Deterministic character 1–3-gram language ID built from langdetect's bundled
+    profiles. It is loaded once per process into one (grams × languages) weight
+    matrix. A call is one pass over the text's n-grams plus one matrix product,
+    with no random trials or iterations, so it costs a small fraction of
+    langdetect.detect.
+    """
+    def __init__(self, profiles_dir: str, min_grams: int = 12):
+        import numpy as np
+        profs = []
+        for name in sorted(os.listdir(profiles_dir)):
+            with open(os.path.join(profiles_dir, name), "r", encoding="utf-8") as f:
+                profs.append(json.load(f))
+        self.langs: List[str] = [p["name"] for p in profs]
+        self.index: Dict[str, int] = {}  # gram -> row of `weights`
+        for p in profs:
+            for g in p["freq"]:
+                if 1 <= len(g) <= 3: self.index.setdefault(g, len(self.index))
+        # weights[g, l] = log(P(g | l) + SMOOTH) - log(SMOOTH): an n-gram a language never saw adds 0
+        self.weights = np.zeros((len(self.index), len(profs)), dtype=np.float32)
+        for li, p in enumerate(profs):
+            totals = p["n_words"]
+            for g, c in p["freq"].items():
+                row = self.index.get(g)
+                if row is not None:
+                    self.weights[row, li] = math.log1p(c / totals[len(g) - 1] / SMOOTH)
+        self.min_grams = min_grams
+        self._norm: Dict[str, str] = {}
+
+    def grams(self, text: str) -> Counter:
+        """langdetect's n-gram extraction (NGram.add_char/get), with the char normalization memoized."""
+        norm, known, out = self._norm, self.index, Counter()
+        buf, caps = " ", False
+        for ch in text:
+            c = norm.get(ch)
+            if c is None:
+                c = norm[ch] = NGram.normalize(ch)
+            last = buf[-1]
+            if last == " ":
+                buf, caps = " ", False
+                if c == " ":
+                    continue
+            elif len(buf) >= 3:
+                buf = buf[1:]
+            buf += c
+            if c.isupper():
+                if last.isupper(): caps = True
+            else:
+                caps = False
+            if caps:
+                continue
+            if c != " " and c in known: out[c] += 1
+            if len(buf) >= 2:
+                g = buf[-2:]
+                if g in known: out[g] += 1
+                if len(buf) == 3 and buf in known: out[buf] += 1
+        return out
+
+    def classify(self, text: str) -> Tuple[Optional[str], int]:
+        """(language or None when there is too little evidence, number of n-grams used)."""
+        grams = self.grams(text)
+        used = sum(grams.values())
+        if used < self.min_grams:
+            return None, used
+        import numpy as np
+        rows = np.fromiter((self.index[g] for g in grams), dtype=np.intp, count=len(grams))
+        counts = np.fromiter(grams.values(), dtype=np.float32, count=len(grams))
+        return self.langs[int((counts @ self.weights[rows]).argmax())], used
+
+_MODEL: Optional[NgramLangID] = None
+_LOCK = threading.Lock()
+
+def get_model() -> Optional[NgramLangID]:
+    """The process-wide model (None when langdetect's profiles are not installed)."""
+    global _MODEL
+    if _MODEL is None and PROFILES is not None:
+        with _LOCK:
+            if _MODEL is None:
+                _MODEL = NgramLangID(PROFILES)
+    return _MODEL
@@ -0,0 +1,139 @@
+import re
+from collections import Counter
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+from .boiler_skim import BoilerSkim
+from .marklist_normalizer import MarklistNormalizer
+from .page_tag_wiper import PageTagWiper
+
+LineRule = Callable[[str], Optional[str]]   # return None to drop the line
+PageRule = Callable[[str], str]
+
+_BULLET = re.compile(r'^[\t ]*([%s\-–—])\s*(.*)$' % re.escape(MarklistNormalizer.BULLETS), re.MULTILINE)
+_CHECKED = re.compile(r'^[\t ]*\[(x|X)\]\s*', re.MULTILINE)
+_UNCHECKED = re.compile(r'^[\t ]*\[\s*\]\s*', re.MULTILINE)
+_LABELS = [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in PageTagWiper.PAGE_PATTERNS]
+# One scan that finds a match iff some label pattern matches somewhere on the page
+_ANY_LABEL = re.compile("|".join("(?:%s)" % p for p in PageTagWiper.PAGE_PATTERNS), re.IGNORECASE | re.MULTILINE)
+_BLANKS = re.compile(r'\n{3,}')
+_JOIN_PUNCT = {',', ';', '—', '–'}
+
+def _bullet_repl(m): return "- " + (m.group(2) or "")
+
+class PostChain:
+    """
+    Fused PageTagWiper → BoilerSkim → ParaWeld → MarklistNormalizer → remove_page_labels.
+    Rules are compiled once at import; each page is split into lines once and the
+    document-level statistics (repeated headers/footers, boilerplate) take two
+    cheap passes. Output is identical to running the classes one after another.
+
+    Extra rules plug in with add_line_rule (per kept line, before paragraph
+    welding) and add_page_rule (per page, after list normalization).
+    """
+    def __init__(self, top_k: int = 2, bottom_k: int = 2, repeat_thresh: float = 0.45, min_pages: int = 3,
+                 boiler_min_len: int = 6, boiler_freq: float = 0.5, boiler_min_pages: int = 3, max_join_len: int = 120):
+        self.top_k, self.bottom_k, self.repeat_thresh, self.min_pages = top_k, bottom_k, repeat_thresh, min_pages
+        self.boiler_min_len, self.boiler_freq, self.boiler_min_pages = boiler_min_len, boiler_freq, boiler_min_pages
+        self.max_join_len = max_join_len
+        self.line_rules: List[LineRule] = []
+        self.page_rules: List[PageRule] = []
+
+    def add_line_rule(self, rule: LineRule) -> "PostChain":
+        self.line_rules.append(rule); return self
+
+    def add_page_rule(self, rule: PageRule) -> "PostChain":
+        self.page_rules.append(rule); return self
+
+    # ---- document statistics -------------------------------------------------
+    def edge_lines(self, stripped: List[str]) -> Tuple[List[str], List[str]]:
+        """(top, bottom) candidate lines of one page, from its stripped lines."""
+        top = [s for s in stripped[:self.top_k] if s]
+        nonempty = [s for s in stripped if s]
+        return top, (nonempty[-self.bottom_k:] if nonempty else [])
+
+    def edge_removals(self, tc: Counter, bc: Counter, n: int) -> Tuple[Set[str], Set[str]]:
+        return ({l for l, c in tc.items() if c / n >= self.repeat_thresh},
+                {l for l, c in bc.items() if c / n >= self.repeat_thresh})
+
+    def body_lines(self, stripped: List[str], top_remove: Set[str], bot_remove: Set[str]) -> List[str]:
+        """A page's lines after header/footer removal and BoilerSkim's length filter, normalized."""
+        # " ".join(s.split()) == re.sub(r'\s+', ' ', s) for stripped s (same Unicode whitespace set)
+        return [" ".join(s.split()) for s in stripped
+                if s and s not in top_remove and s not in bot_remove and len(s) >= self.boiler_min_len]
+
+    def boiler_removals(self, bcount: Counter, n: int) -> Set[str]:
+        return {l for l, c in bcount.items() if c / n >= self.boiler_freq}
+
+    # ---- per-page transforms -------------------------------------------------
+    def weld(self, lines: Iterable[str]) -> List[str]:
+        out: List[str] = []
+        mj = self.max_join_len
+        for ln in lines:
+            if not out: out.append(ln); continue
+            prev = out[-1]
+            head = ln[:1]
+            if prev.endswith('-') and ln and head.islower(): out[-1] = prev[:-1] + ln; continue
+            ps = prev.strip()
+            if len(prev) < mj and not (ps and ps[-1] in ".?!:;)") and (head.islower() or head in _JOIN_PUNCT):
+                out[-1] = prev.rstrip() + " " + ln.lstrip()
+            else: out.append(ln)
+        return out
+
+    def finish(self, lines: Iterable[str]) -> Tuple[str, str]:
+        """Kept lines of one page → (page slice, page text with page labels removed)."""
+        if self.line_rules:
+            kept = []
+            for ln in lines:
+                for rule in self.line_rules:
+                    ln = rule(ln)
+                    if ln is None: break
+                if ln is not None: kept.append(ln)
+            lines = kept
+        text = "\n".join(self.weld(lines))
+        text = _BULLET.sub(_bullet_repl, text)
+        if "[" in text:
+            text = _CHECKED.sub('- [x] ', text)
+            text = _UNCHECKED.sub('- [ ] ', text)
+        for rule in self.page_rules:
+            text = rule(text)
+        clean = text
+        if _ANY_LABEL.search(clean):
+            for pat in _LABELS:
+                clean = pat.sub("", clean)
+        if "\n\n\n" in clean:
+            clean = _BLANKS.sub('\n\n', clean)
+        return text, clean
+
+    # ---- in-memory driver ----------------------------------------------------
+    def run(self, pages: List[str]) -> Tuple[List[str], List[str]]:
+        """Returns (page_slices, cleaned_pages) exactly as the separate classes would."""
+        n = len(pages)
+        if n < self.min_pages or n < self.boiler_min_pages:
+            # Either the wiper or the skimmer is a no-op here; fall back to its exact semantics.
+            return self._run_short(pages)
+        split = [[l.strip() for l in p.splitlines()] for p in pages]
+        tc, bc = Counter(), Counter()
+        for stripped in split:
+            top, bottom = self.edge_lines(stripped)
+            tc.update(top); bc.update(bottom)
+        top_remove, bot_remove = self.edge_removals(tc, bc, n)
+        per = [self.body_lines(stripped, top_remove, bot_remove) for stripped in split]
+        del split
+        bcount = Counter()
+        for ls in per: bcount.update(set(ls))
+        remove = self.boiler_removals(bcount, n)
+        slices, cleaned = [], []
+        for ls in per:
+            s, c = self.finish(l for l in ls if l not in remove)
+            slices.append(s); cleaned.append(c)
+        return slices, cleaned
+
+    def _run_short(self, pages: List[str]) -> Tuple[List[str], List[str]]:
+        if len(pages) >= self.min_pages:
+            pages = PageTagWiper().strip_headers_footers(pages, self.top_k, self.bottom_k, self.repeat_thresh, self.min_pages)
+        if len(pages) >= self.boiler_min_pages:
+            pages = BoilerSkim(self.boiler_min_len, self.boiler_freq, self.boiler_min_pages).drop(pages)
+        slices, cleaned = [], []
+        for p in pages:
+            s, c = self.finish(p.splitlines())
+            slices.append(s); cleaned.append(c)
+        return slices, cleaned
@@ -0,0 +1,129 @@
+import os, json
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, Set, Tuple
+from .post_chain import PostChain
+
+class PageSpill:
+    """
+    Raw pages on disk, one JSON string per line, so a document's text never has
+    to sit in memory as a list. `lines` is an upper bound on the number of text
+    lines (sizes the pruned counters of stream_post).
+    """
+    def __init__(self, path: str, pages: int = 0, lines: int = 0):
+        self.path, self.pages, self.lines = path, pages, lines
+
+    @classmethod
+    def write(cls, path: str, pages: Iterable[str]) -> "PageSpill":
+        sp = cls(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for p in pages:
+                f.write(json.dumps(p, ensure_ascii=False)); f.write("\n")
+                sp.pages += 1; sp.lines += len(p.splitlines())
+        return sp
+
+    def patch(self, repl: Dict[int, str]) -> "PageSpill":
+        """Replace pages by 0-based index (e.g. OCR output for scanned pages); rewrites the file."""
+        tmp = self.path + ".tmp"
+        sp = PageSpill.write(tmp, (repl.get(i, p) for i, p in enumerate(self)))
+        os.replace(tmp, self.path)
+        self.pages, self.lines = sp.pages, sp.lines
+        return self
+
+    def __iter__(self) -> Iterator[str]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def meta(self) -> Dict:
+        return {"file": os.path.basename(self.path), "pages": self.pages, "lines": self.lines}
+
+
+class _Lossy:
+    """
+    Lossy counting (Manku & Motwani) over hashed keys. Every key occurring more
+    than total/width times survives, in O(width * log(total/width)) entries.
+    """
+    __slots__ = ("width", "seen", "bucket", "d")
+
+    def __init__(self, width: int):
+        self.width, self.seen, self.bucket, self.d = max(1, int(width)), 0, 1, {}
+
+    def add(self, key: int) -> None:
+        e = self.d.get(key)
+        if e is None: self.d[key] = [1, self.bucket - 1]
+        else: e[0] += 1
+        self.seen += 1
+        if self.seen % self.width == 0:
+            b = self.bucket
+            self.d = {k: e for k, e in self.d.items() if e[0] + e[1] > b}
+            self.bucket += 1
+
+    def candidates(self, min_count: float) -> Set[int]:
+        """Keys whose count may reach min_count (count + max undercount)."""
+        return {k for k, (c, dl) in self.d.items() if c + dl >= min_count}
+
+
+def _width(total: int, frac: float, n: int) -> int:
+    # keys with count >= frac*n must exceed total/width to be guaranteed a slot
+    return int(total / max(frac * n, 1e-9)) + 2
+
+
+def stream_post(chain: PostChain, spill: PageSpill) -> Iterator[Tuple[str, str]]:
+    """
+    Bounded-memory PostChain.run over a page spill; yields (page slice, cleaned page)
+    per page, identical to the in-memory path.
+
+    pass 1: pruned counters over hashed header/footer and boilerplate lines → candidates
+    pass 2: exact counts for the candidates only → header/footer and boilerplate removals
+    pass 3: apply the removals and per-page transforms, one page at a time
+    """
+    n = spill.pages
+    if n < chain.min_pages or n < chain.boiler_min_pages:
+        slices, cleaned = chain.run(list(spill))
+        yield from zip(slices, cleaned)
+        return
+    t, bt, ml = chain.repeat_thresh, chain.boiler_freq, chain.boiler_min_len
+
+    # pass 1: body candidates count every long line (a superset of the lines left after
+    # header/footer removal), so no real boilerplate line can be pruned away
+    top = _Lossy(_width(chain.top_k * n, t, n))
+    bot = _Lossy(_width(chain.bottom_k * n, t, n))
+    body = _Lossy(_width(spill.lines, bt, n))
+    for p in spill:
+        stripped = [l.strip() for l in p.splitlines()]
+        tl, bl = chain.edge_lines(stripped)
+        for s in tl: top.add(hash(s))
+        for s in bl: bot.add(hash(s))
+        for x in {" ".join(s.split()) for s in stripped if s and len(s) >= ml}: body.add(hash(x))
+    slack = 1 - 1e-9
+    tcand, bcand, xcand = top.candidates(t * n * slack), bot.candidates(t * n * slack), body.candidates(bt * n * slack)
+    del top, bot, body
+
+    # pass 2: exact counts, keyed by the real strings. A boilerplate candidate's page count
+    # depends on the header/footer verdict, so count (line, raw variants on the page) pairs.
+    tc, bc, sig = Counter(), Counter(), Counter()
+    for p in spill:
+        stripped = [l.strip() for l in p.splitlines()]
+        tl, bl = chain.edge_lines(stripped)
+        tc.update(s for s in tl if hash(s) in tcand)
+        bc.update(s for s in bl if hash(s) in bcand)
+        if xcand:
+            variants: Dict[str, Set[str]] = defaultdict(set)
+            for s in stripped:
+                if s and len(s) >= ml:
+                    x = " ".join(s.split())
+                    if hash(x) in xcand: variants[x].add(s)
+            sig.update((x, frozenset(vs)) for x, vs in variants.items())
+    top_remove, bot_remove = chain.edge_removals(tc, bc, n)
+    bcount = Counter()
+    for (x, vs), c in sig.items():
+        if any(v not in top_remove and v not in bot_remove for v in vs):
+            bcount[x] += c
+    remove = chain.boiler_removals(bcount, n)
+    del tc, bc, sig, bcount
+
+    # pass 3: transform and hand each page on
+    for p in spill:
+        ls = chain.body_lines([l.strip() for l in p.splitlines()], top_remove, bot_remove)
+        yield chain.finish(l for l in ls if l not in remove)
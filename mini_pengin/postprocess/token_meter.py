@@ -1,4 +1,45 @@
 import re
-def split_tokens(text:str)->int: return len(re.findall(r"[A-Za-z0-9_]+|[^\sA-Za-z0-9_]", text))
-class TokenMeter:
+from functools import lru_cache
+_TOKEN=re.compile(r"[A-Za-z0-9_]+|[^\sA-Za-z0-9_]")
+_WORD=frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_")
+def split_tokens(text:str)->int: return _TOKEN.subn("",text)[1]  # counts matches without building a token list
+
+class RegexTokenizer:
+    name="regex"
+    merges_across_pages=True  # "foo" + "bar" on two pages is one token in the joined text
     def count(self,text:str)->int: return split_tokens(text)
+    def spans(self,text:str):
+        for m in _TOKEN.finditer(text): yield m.span()
+
+class HFTokenizer:
+    """A Hugging Face tokenizer from the local cache only (never downloads)."""
+    merges_across_pages=False
+    def __init__(self,name:str):
+        from transformers import AutoTokenizer
+        self.name=name; self.tk=AutoTokenizer.from_pretrained(name,local_files_only=True)
+    def count(self,text:str)->int: return len(self.tk(text,add_special_tokens=False,verbose=False)["input_ids"])
+    def spans(self,text:str):
+        enc=self.tk(text,add_special_tokens=False,return_offsets_mapping=True,verbose=False)
+        for s,e in enc["offset_mapping"]: yield s,e
+
+@lru_cache(maxsize=None)
+def get_tokenizer(name:str="regex"):
+    """'regex' or a HF tokenizer name/path; falls back to regex when it is not cached locally."""
+    if name=="regex": return RegexTokenizer()
+    try: return HFTokenizer(name)
+    except Exception: return RegexTokenizer()
+
+class TokenMeter:
+    def __init__(self,tokenizer=None): self.tokenizer=tokenizer or RegexTokenizer()
+    def count(self,text:str)->int: return self.tokenizer.count(text)
+    def page_counts(self,pages,count=None):
+        """(per-page counts, document count) over pages joined with "". For the regex tokenizer the document
+        count equals count("".join(pages)): a word split across a page boundary counts once."""
+        count=count or self.count; merge=self.tokenizer.merges_across_pages
+        out=[]; total=0; last=""
+        for p in pages:
+            k=count(p); out.append(k); total+=k
+            if merge and p:
+                if last in _WORD and p[0] in _WORD: total-=1
+                last=p[-1]
+        return out,total
@@ -1,9 +1,41 @@
+from collections import Counter
+from typing import Dict, Tuple
+from .ngram_lang import get_model
 try:
-    from langdetect import detect
+    from langdetect import detect, DetectorFactory
+    DetectorFactory.seed=0  # langdetect samples randomly; seeded, the same text always gets the same tag
 except Exception:
     detect=None
+PREFIX_CHARS=10000  # guess() only looks at the start of the text
+PAGE_SAMPLE_CHARS=400
 class TongueTagger:
     def guess(self,text:str)->str:
         if detect is None: return "unknown"
-        try: return detect(text[:10000])
+        try: return detect(text[:PREFIX_CHARS])
         except Exception: return "unknown"
+
+class PageTongues:
+    """
+    Language per page plus a document-level distribution, fed cleaned pages in order.
+    engine "ngram" tags a PAGE_SAMPLE_CHARS sample from the middle of every page with the
+    n-gram model; "langdetect" keeps the single guess over the first PREFIX_CHARS characters.
+    """
+    def __init__(self,engine:str="ngram",sample_chars:int=PAGE_SAMPLE_CHARS):
+        self.model=get_model() if engine=="ngram" else None
+        self.engine="ngram" if self.model is not None else "langdetect"
+        self.sample_chars=sample_chars
+        self.pages=[]; self.weights=Counter(); self.head=""
+    def feed(self,text:str)->None:
+        if self.model is None:
+            if len(self.head)<PREFIX_CHARS: self.head+=text[:PREFIX_CHARS-len(self.head)]
+            return
+        i=max(0,(len(text)-self.sample_chars)//2)
+        lang,used=self.model.classify(text[i:i+self.sample_chars])
+        self.pages.append(lang)
+        if lang: self.weights[lang]+=used
+    def result(self)->Tuple[str,Dict]:
+        """(document language, meta: page_languages + language_dist shares by n-gram evidence)."""
+        if self.model is None: return TongueTagger().guess(self.head),{}
+        total=sum(self.weights.values())
+        dist={l:round(w/total,3) for l,w in self.weights.most_common()} if total else {}
+        return next(iter(dist),"unknown"),{"page_languages":self.pages,"language_dist":dist}
@@ -1,12 +1,24 @@
+from typing import List
 from .utils.pdf_probe import probe_pdf
 from .schemas import DocProbe, PageInfo
 
-def build_probe(path: str, max_pages: int = 12) -> DocProbe:
-    num_pages, pages = probe_pdf(path, max_pages=max_pages)
-    text_pages = sum(1 for p in pages if p.chars > 40)
+TEXT_PAGE_MIN_CHARS = 40
+
+def build_probe(src, max_pages: int = 12) -> DocProbe:
+    """src: a path or a DocSession."""
+    num_pages, pages = probe_pdf(src, max_pages=max_pages)
+    text_pages = sum(1 for p in pages if p.chars > TEXT_PAGE_MIN_CHARS)
     ratio = (text_pages / max(1, len(pages)))
-    page_infos = [PageInfo(index=p.index, chars=p.chars, images=p.images) for p in pages]
+    page_infos = [PageInfo(index=p.index, chars=p.chars, images=p.images, img_dpi=p.img_dpi) for p in pages]
     return DocProbe(num_pages=num_pages, pages=page_infos, text_pages=text_pages, text_page_ratio=ratio)
 
 def route_mode(probe: DocProbe, min_text_ratio: float):
     return "ocr" if probe.text_page_ratio < min_text_ratio else "non_ocr"
+
+def route_pages(page_texts: List[str], page_images: List[int]) -> List[str]:
+    """Per-page decision: OCR only pages without a real text layer that carry an image."""
+    return ["ocr" if len(t) <= TEXT_PAGE_MIN_CHARS and n else "native" for t, n in zip(page_texts, page_images)]
+
+def needs_ocr_hint(probe: DocProbe) -> bool:
+    """Whether any sampled page looks scanned (lane hint for per-page routing)."""
+    return any(p.chars <= TEXT_PAGE_MIN_CHARS and p.images for p in probe.pages)
@@ -0,0 +1,75 @@
+import os, json, hashlib, threading
+from dataclasses import asdict
+from typing import Dict, Optional
+from .config import ForgeConfig
+from . import ingest_io
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# ForgeConfig fields that influence each stage's output. A change only invalidates
+# the stage(s) listing the field; later stages always rerun when an earlier one does.
+STAGE_FIELDS = {
+    "extract": ["min_text_page_ratio", "max_pages_probe", "route_granularity", "ocr_engine", "ocr_lang", "deepseek_prompt",
+                "ocr_dpi", "ocr_max_dpi", "ocr_precision", "text_engine"],
+    "tables": ["tables", "table_format", "table_min_score", "table_gate", "table_gate_threshold"],
+    "post": ["lang_detector", "save_pages", "keep_jsonl", "tokenizer", "chunk_tokens", "chunk_overlap",
+             "output", "shard_gzip"],
+}
+
+def stage_fingerprints(cfg: ForgeConfig) -> Dict[str, str]:
+    d = asdict(cfg)
+    out = {}
+    for stage, fields in STAGE_FIELDS.items():
+        blob = json.dumps({k: d.get(k) for k in fields}, sort_keys=True, default=str)
+        out[stage] = hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+    return out
+
+class RunManifest:
+    """
+    Append-only JSONL manifest in the output dir, keyed by content sha256.
+    Each finished document appends one line (last line wins on reload), so an
+    interrupted run resumes from whatever made it to disk.
+    A (path, size, mtime_ns) → sha256 cache avoids rehashing unchanged files.
+    """
+    def __init__(self, outdir: str):
+        self.path = os.path.join(outdir, MANIFEST_NAME)
+        self.entries: Dict[str, Dict] = {}
+        self.by_path: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try: e = json.loads(line)
+                    except ValueError: continue  # torn last line after a crash
+                    self.entries[e["sha256"]] = e
+                    if e.get("path"): self.by_path[e["path"]] = e
+
+    def content_hash(self, path: str, session=None) -> str:
+        """Cached hash when (size, mtime) are unchanged; else hash the session buffer or the file."""
+        st = os.stat(path)
+        e = self.by_path.get(os.path.abspath(path))
+        if e and e.get("size") == st.st_size and e.get("mtime_ns") == st.st_mtime_ns:
+            return e["sha256"]
+        return session.sha256 if session is not None else ingest_io.sha256_of_file(path)
+
+    def lookup(self, sha256: str) -> Optional[Dict]:
+        return self.entries.get(sha256)
+
+    def record(self, path: str, result: Dict) -> None:
+        """Persist a finished document; `result` must carry sha256 and stages."""
+        st = os.stat(path)
+        e = {
+            "sha256": result["sha256"],
+            "doc_id": result["doc_id"],
+            "path": os.path.abspath(path),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "stages": result["stages"],
+            "result": {k: v for k, v in result.items() if k not in ("sha256", "stages", "skipped", "timings")},
+        }
+        line = json.dumps(e, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line); f.flush(); os.fsync(f.fileno())
+            self.entries[e["sha256"]] = e
+            self.by_path[e["path"]] = e
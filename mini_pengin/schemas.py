@@ -1,11 +1,12 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 
 @dataclass
 class PageInfo:
     index: int
     chars: int
     images: int
+    img_dpi: float = 0.0
 
 @dataclass
 class DocProbe:
@@ -23,3 +24,38 @@ class DocBundle:
     routed: str
     language: Optional[str] = None
     meta: Dict = field(default_factory=dict)
+
+@dataclass
+class TableItem:
+    """An extracted table kept in memory until the output stage writes it once."""
+    engine: str
+    name: str                    # output stem, e.g. table_01 / camelot_lattice_01
+    page: Optional[int] = None   # 1-based
+    df: Any = None               # cleaned pandas DataFrame (None if parsing failed)
+    score: float = 0.0           # tables_utils.score_table
+    html: Optional[str] = None
+    md: Optional[str] = None
+
+@dataclass
+class DocJob:
+    """Per-document state handed from one pipeline stage to the next."""
+    path: str
+    outdir: str
+    sha256: str = ""
+    doc_id: str = ""
+    stages: Dict[str, str] = field(default_factory=dict)
+    prev: Optional[Dict] = None          # previous manifest entry, if any
+    use_ocr: bool = False
+    extracted: Optional[Dict] = None     # routed/route_reason/probe (+ pages once extracted)
+    table_meta: Optional[Dict] = None
+    result: Optional[Dict] = None        # set by the last stage (or by a resume skip)
+    session: Any = None                  # DocSession shared by all stages; closed by close()
+    docling_doc: Any = None              # converted DoclingDocument when --text-engine docling
+    spans: Any = None                    # Spans: wall/CPU time per stage and sub-step
+    profiler: Any = None                 # cProfile.Profile with --profile
+
+    def close(self) -> None:
+        self.docling_doc = None
+        if self.session is not None:
+            self.session.close()
+            self.session = None
@@ -0,0 +1,304 @@
+import argparse, os, sys, json, time, uuid, queue, signal, socketserver, threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+from .config import ForgeConfig
+from .cli_args import add_pipeline_args, config_from_args
+from .forge_runner import warm_engines
+from .run_manifest import RunManifest
+from .worker_pool import make_executor
+from .tables.table_sink import close_sinks
+from .shard_writer import close_writers
+
+INBOX_DIR = ".inbox"  # uploaded PDF bytes, removed once their job finishes
+
+
+class Busy(RuntimeError):
+    """Submission refused: the queue is full or the daemon is draining."""
+
+
+class IngestDaemon:
+    """
+    Long-lived pipeline: engines are loaded once, then each job is one run_on_pdf call
+    on a warm executor. At most `limit` documents are in the executor at a time;
+    further jobs wait in a bounded queue, and submissions beyond it raise Busy.
+    Finished jobs stay queryable (the last `keep` of them) and are pushed to every
+    event listener. drain() stops intake, finishes queued and running jobs, and
+    closes the output sinks.
+    """
+    def __init__(self, outdir: str, cfg: ForgeConfig, manifest: Optional[RunManifest] = None,
+                 queue_max: int = 1024, keep: int = 10000):
+        if cfg.executor == "lanes":
+            cfg.executor = "thread"  # lanes is a batch pipeline; the daemon runs whole documents
+        self.outdir, self.cfg, self.manifest, self.keep = outdir, cfg, manifest, keep
+        self.ex, self.submit_fn = make_executor(cfg, outdir, manifest)
+        if cfg.executor == "thread":
+            warm_engines(cfg)  # process workers warm themselves in their initializer
+        self.limit = cfg.max_inflight or 2 * max(1, cfg.workers)
+        self._slots = threading.Semaphore(self.limit)
+        self._pending: queue.Queue = queue.Queue(queue_max)
+        self.jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._done: Dict[str, threading.Event] = {}
+        self._listeners: List[queue.Queue] = []
+        self._lock = threading.Lock()
+        self.draining = False
+        self.counts = {"submitted": 0, "done": 0, "error": 0, "running": 0}
+        self._thread = threading.Thread(target=self._dispatch, name="serve-dispatch", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, name: Optional[str] = None, upload: bool = False) -> Dict:
+        job = {"id": uuid.uuid4().hex[:16], "path": path, "status": "queued", "submitted": time.time()}
+        if name: job["name"] = name
+        with self._lock:
+            if self.draining:
+                raise Busy("draining")
+            try:
+                self._pending.put_nowait((job, upload))
+            except queue.Full:
+                raise Busy("queue full")
+            self.jobs[job["id"]] = job
+            self._done[job["id"]] = threading.Event()
+            self.counts["submitted"] += 1
+        return dict(job)
+
+    def submit_bytes(self, data: bytes, name: Optional[str] = None) -> Dict:
+        d = os.path.join(self.outdir, INBOX_DIR)
+        os.makedirs(d, exist_ok=True)
+        path = os.path.join(d, f"{uuid.uuid4().hex}.pdf")
+        with open(path, "wb") as f:
+            f.write(data)
+        try:
+            return self.submit(path, name=name or "upload.pdf", upload=True)
+        except Busy:
+            os.remove(path); raise
+
+    def _dispatch(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            job, upload = item
+            self._slots.acquire()
+            with self._lock:
+                job.update(status="running", started=time.time())
+                self.counts["running"] += 1
+            try:
+                fut = self.submit_fn(job["path"])
+            except Exception as e:
+                self._finish(job, upload, None, e); continue
+            fut.add_done_callback(lambda f, j=job, u=upload: self._finish(j, u, f))
+
+    def _finish(self, job: Dict, upload: bool, fut, exc: Optional[BaseException] = None) -> None:
+        from .forge_runner import StageError
+        try:
+            if fut is not None:
+                exc = fut.exception()
+            if exc is None:
+                res = fut.result()
+                if self.manifest is not None and not res.get("skipped"):
+                    self.manifest.record(job["path"], res)
+                job.update(status="done", result=res)
+            else:
+                err = exc if isinstance(exc, StageError) else StageError(job["path"], "worker", type(exc).__name__, str(exc))
+                job.update(status="error", error=err.to_dict())
+        except Exception as e:
+            job.update(status="error", error={"path": job["path"], "stage": "serve", "error": type(e).__name__, "message": str(e)})
+        finally:
+            job["finished"] = time.time()
+            if upload:
+                try: os.remove(job["path"])
+                except OSError: pass
+            with self._lock:
+                self.counts["running"] -= 1
+                self.counts[job["status"]] += 1
+                line = json.dumps(job, ensure_ascii=False)
+                for q in self._listeners: q.put(line)
+                self._done.pop(job["id"]).set()
+                while len(self.jobs) > self.keep:  # forget the oldest finished jobs
+                    old = next(iter(self.jobs))
+                    if old in self._done: break
+                    self.jobs.pop(old)
+            self._slots.release()
+
+    def get(self, job_id: str, wait: float = 0.0) -> Optional[Dict]:
+        with self._lock:
+            ev = self._done.get(job_id)
+        if ev is not None and wait > 0:
+            ev.wait(wait)
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def listen(self) -> queue.Queue:
+        q: queue.Queue = queue.Queue()
+        with self._lock: self._listeners.append(q)
+        return q
+
+    def unlisten(self, q: queue.Queue) -> None:
+        with self._lock:
+            if q in self._listeners: self._listeners.remove(q)
+
+    def status(self) -> Dict:
+        with self._lock:
+            return dict(self.counts, status="draining" if self.draining else "ok", queued=self._pending.qsize(), limit=self.limit)
+
+    def drain(self) -> None:
+        """Refuse new jobs, finish every accepted one, then close the sinks."""
+        with self._lock:
+            self.draining = True
+        self._pending.put(None)
+        self._thread.join()
+        self.ex.shutdown(wait=True)
+        close_sinks(); close_writers()
+        with self._lock:
+            for q in self._listeners: q.put(None)
+
+
+def _wait(qs: Dict) -> float:
+    """?wait=S as a non-negative float (ValueError → 400)."""
+    wait = float(qs.get("wait", ["0"])[0])
+    if not (0 <= wait < float("inf")):
+        raise ValueError("wait must be a number of seconds >= 0")
+    return wait
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    POST /jobs                 {"path": ...} or {"paths": [...]}; or a raw PDF body (Content-Type: application/pdf)
+    POST /jobs?wait=S          same, but answer with the finished job(s), waiting up to S seconds
+    GET  /jobs/<id>[?wait=S]   one job (long poll with wait)
+    GET  /events               NDJSON stream of jobs as they finish
+    GET  /health               counts, queue length, ok|draining
+    """
+    daemon: IngestDaemon = None
+    max_bytes = 256 << 20
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def address_string(self) -> str:
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send(self, code: int, body) -> None:
+        data = (json.dumps(body, ensure_ascii=False) + "\n").encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        qs = parse_qs(url.query)
+        if url.path == "/health":
+            return self._send(200, self.daemon.status())
+        if url.path.startswith("/jobs/"):
+            try:
+                wait = _wait(qs)
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            job = self.daemon.get(url.path[len("/jobs/"):], wait)
+            return self._send(200, job) if job else self._send(404, {"error": "unknown job"})
+        if url.path == "/events":
+            return self._events()
+        self._send(404, {"error": "not found"})
+
+    def _events(self):
+        q = self.daemon.listen()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            while True:
+                try: line = q.get(timeout=15.0)
+                except queue.Empty: line = ""  # keepalive, also notices closed clients
+                if line is None:
+                    return
+                self.wfile.write((line + "\n").encode("utf-8")); self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            self.daemon.unlisten(q)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        qs = parse_qs(url.query)
+        if url.path != "/jobs":
+            return self._send(404, {"error": "not found"})
+        n = int(self.headers.get("Content-Length") or 0)
+        if n > self.max_bytes:
+            return self._send(413, {"error": f"body larger than {self.max_bytes} bytes"})
+        body = self.rfile.read(n)
+        ctype = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+        usage = {"error": "expected {\"path\": ...}, {\"paths\": [...]} or a PDF body"}
+        try:
+            wait = _wait(qs)
+            if ctype in ("application/pdf", "application/octet-stream"):
+                jobs = [self.daemon.submit_bytes(body, name=qs.get("name", [None])[0])]
+            else:
+                req = json.loads(body or b"{}")
+                if not isinstance(req, dict):
+                    return self._send(400, usage)
+                paths = req.get("paths") or ([req["path"]] if req.get("path") else [])
+                if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths) or not paths:
+                    return self._send(400, usage)
+                jobs = [self.daemon.submit(os.path.abspath(p)) for p in paths]
+        except Busy as e:
+            return self._send(503, {"error": str(e)})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        if wait > 0:
+            deadline = time.monotonic() + wait
+            jobs = [self.daemon.get(j["id"], max(0.0, deadline - time.monotonic())) for j in jobs]
+            code = 200 if all(j["status"] in ("done", "error") for j in jobs) else 202
+        else:
+            code = 202
+        self._send(code, {"jobs": jobs})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="mini-pengin serve",
+                                 description="Keep engines warm and process PDFs submitted over local HTTP or a Unix socket")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--socket", default=None, help="listen on this Unix socket path instead of TCP")
+    ap.add_argument("--queue", type=int, default=1024, help="jobs waiting beyond --max-inflight; more submissions get 503")
+    ap.add_argument("--keep-results", type=int, default=10000, help="finished jobs kept for polling")
+    ap.add_argument("--max-upload-mb", type=float, default=256.0)
+    ap.add_argument("--tables-roll-secs", type=float, default=300.0,
+                    help="--table-format columnar: close the Parquet file this often and start a new part, so finished parts are readable")
+    ap.add_argument("--force", action="store_true", help="ignore the run manifest and reprocess every PDF")
+    add_pipeline_args(ap)
+    a = ap.parse_args(argv)
+    cfg = config_from_args(a, table_roll_secs=a.tables_roll_secs)
+    os.makedirs(a.out, exist_ok=True)
+    daemon = IngestDaemon(a.out, cfg, None if a.force else RunManifest(a.out), queue_max=a.queue, keep=a.keep_results)
+    handler = type("Handler", (_Handler,), {"daemon": daemon, "max_bytes": int(a.max_upload_mb * (1 << 20))})
+    if a.socket:
+        if os.path.exists(a.socket): os.remove(a.socket)
+        server = _UnixHTTPServer(a.socket, handler)
+        where = f"unix:{a.socket}"
+    else:
+        server = ThreadingHTTPServer((a.host, a.port), handler)
+        server.daemon_threads = True
+        where = f"http://{a.host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="serve-http", daemon=True).start()
+    print(f"[serve] listening on {where} (workers {cfg.workers}, max in flight {daemon.limit})", file=sys.stderr, flush=True)
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    while not stop.wait(1.0):
+        pass
+    # Graceful drain: keep answering polls while accepted jobs finish, then close
+    print(f"[serve] draining ({daemon.status()['queued']} queued, {daemon.status()['running']} running)", file=sys.stderr, flush=True)
+    daemon.drain()
+    server.shutdown(); server.server_close()
+    if a.socket and os.path.exists(a.socket): os.remove(a.socket)
+    print(f"[serve] stopped: {json.dumps(daemon.status())}", file=sys.stderr, flush=True)
@@ -0,0 +1,148 @@
+import os, json, gzip, queue, shutil, threading, time, itertools
+from typing import Dict, List, Optional
+
+SHARD_DIR = "shards"
+_STOP = object()
+
+_GEN = itertools.count()  # writers opened in this process; later ones get a suffix
+
+
+class ShardWriter:
+    """
+    Consolidated output for --output shards. One writer thread per process appends
+    each document's JSONL block (a doc record plus optional page and chunk records)
+    to rotating, size-capped shards: shards/docs-<run>-<pid>-00000.jsonl[.gz].
+
+    A block is contiguous, and it is one gzip member when compressed, so
+    index-<run>-<pid>.jsonl maps doc_id → (shard, offset, length) and read_block()
+    can seek straight to a document. Callers serialize (and compress) in their own
+    worker. The offset is assigned at submit time, and flush + fsync happen once per
+    batch of documents or every flush_secs.
+    """
+    def __init__(self, outdir: str, max_bytes: int = 256 << 20, compress: bool = False,
+                 flush_docs: int = 64, flush_secs: float = 2.0, queue_max: int = 256):
+        self.dir = os.path.join(outdir, SHARD_DIR)
+        os.makedirs(self.dir, exist_ok=True)
+        gen = next(_GEN)  # a writer reopened after close_writers() never appends to earlier shards
+        run = time.strftime("%Y%m%dT%H%M%S") + (f"_{gen}" if gen else "")
+        self.prefix = f"docs-{run}-{os.getpid()}"
+        self.ext = ".jsonl.gz" if compress else ".jsonl"
+        self.index_path = os.path.join(self.dir, f"index-{run}-{os.getpid()}.jsonl")
+        self.max_bytes, self.compress = max_bytes, compress
+        self.flush_docs, self.flush_secs = flush_docs, flush_secs
+        self._q: queue.Queue = queue.Queue(queue_max)
+        self._lock = threading.Lock()
+        self._shard, self._size = 0, 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="shard-writer", daemon=True)
+        self._thread.start()
+
+    def _path(self, k: int) -> str:
+        return os.path.join(self.dir, f"{self.prefix}-{k:05d}{self.ext}")
+
+    def _submit(self, doc_id: str, n: int, data) -> Dict:
+        with self._lock:
+            if self._error is not None:
+                raise RuntimeError(f"shard writer failed: {self._error}")
+            if self._size and self._size + n > self.max_bytes:
+                self._shard, self._size = self._shard + 1, 0
+            loc = {"shard": self._path(self._shard), "offset": self._size, "length": n}
+            self._size += n
+            self._q.put((doc_id, loc, data))  # blocks while the writer is behind (backpressure)
+        return loc
+
+    def write(self, doc_id: str, records: List[Dict]) -> Dict:
+        """Queue one document's records; returns its location (shard, offset, length)."""
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data, compresslevel=6)
+        return self._submit(doc_id, len(data), data)
+
+    def write_file(self, doc_id: str, path: str) -> Dict:
+        """Queue a block already written to `path` (streamed documents); the file is removed once copied."""
+        return self._submit(doc_id, os.path.getsize(path), path)
+
+    def open_block(self, path: str):
+        """Text file for a streamed block in this writer's format (one gzip member when compressing)."""
+        if self.compress:
+            return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        return open(path, "w", encoding="utf-8")
+
+    def _loop(self) -> None:
+        f = idx = None
+        cur, pending, last = None, 0, time.monotonic()
+        try:
+            idx = open(self.index_path, "a", encoding="utf-8")
+            while True:
+                try: item = self._q.get(timeout=self.flush_secs)
+                except queue.Empty: item = None
+                if item is _STOP:
+                    break
+                if item is not None:
+                    doc_id, loc, data = item
+                    if loc["shard"] != cur:
+                        if f is not None:
+                            f.flush(); os.fsync(f.fileno()); f.close()
+                        f, cur = open(loc["shard"], "ab"), loc["shard"]
+                    if isinstance(data, bytes):
+                        f.write(data)
+                    else:
+                        with open(data, "rb") as src:
+                            shutil.copyfileobj(src, f, 1 << 20)
+                        os.remove(data)
+                        try: os.rmdir(os.path.dirname(data))
+                        except OSError: pass
+                    idx.write(json.dumps({"doc_id": doc_id, "shard": os.path.basename(loc["shard"]),
+                                          "offset": loc["offset"], "length": loc["length"]}) + "\n")
+                    pending += 1
+                if pending and (item is None or pending >= self.flush_docs or time.monotonic() - last >= self.flush_secs):
+                    for h in (f, idx):
+                        h.flush(); os.fsync(h.fileno())
+                    pending, last = 0, time.monotonic()
+        except BaseException as e:
+            self._error = e
+            while True:  # keep draining so producers never block on a dead writer
+                if self._q.get() is _STOP: break
+        finally:
+            for h in (f, idx):
+                if h is not None:
+                    try: h.flush(); os.fsync(h.fileno()); h.close()
+                    except Exception: pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._q.put(_STOP)
+        self._thread.join()
+
+
+def read_block(shard: str, offset: int, length: int) -> List[Dict]:
+    """The records of one document, given its index entry."""
+    with open(shard, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    if shard.endswith(".gz"):
+        data = gzip.decompress(data)
+    return [json.loads(l) for l in data.decode("utf-8").split("\n") if l]
+
+_WRITERS: Dict[str, ShardWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+def get_writer(outdir: str, max_bytes: int = 256 << 20, compress: bool = False) -> ShardWriter:
+    """Process-wide writer for `outdir`, closed at process exit (pool workers included)."""
+    with _WRITERS_LOCK:
+        w = _WRITERS.get(outdir)
+        if w is None:
+            w = _WRITERS[outdir] = ShardWriter(outdir, max_bytes=max_bytes, compress=compress)
+            import atexit
+            from multiprocessing import util
+            atexit.register(w.close)
+            util.Finalize(w, w.close, exitpriority=10)
+        return w
+
+def close_writers() -> None:
+    with _WRITERS_LOCK:
+        while _WRITERS: _WRITERS.popitem()[1].close()
@@ -0,0 +1,89 @@
+import time, random, contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+class Spans:
+    """
+    Wall and CPU (thread) time per named span for one document. Names are dotted
+    ("tables.docling"), and spans nest, so a parent includes its children. A span
+    entered several times accumulates. The cost is two clock reads per span.
+    """
+    def __init__(self):
+        self.t: Dict[str, List[float]] = {}  # name -> [wall_s, cpu_s, calls]
+
+    @contextmanager
+    def span(self, name: str):
+        w0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - w0, time.thread_time() - c0)
+
+    def add(self, name: str, wall: float, cpu: float) -> None:
+        e = self.t.get(name)
+        if e is None: self.t[name] = [wall, cpu, 1]
+        else: e[0] += wall; e[1] += cpu; e[2] += 1
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {k: {"wall_ms": round(w * 1000, 3), "cpu_ms": round(c * 1000, 3), "n": int(n)} for k, (w, c, n) in self.t.items()}
+
+_CURRENT: contextvars.ContextVar[Optional[Spans]] = contextvars.ContextVar("mini_pengin_spans", default=None)
+
+@contextmanager
+def use_spans(spans: Spans):
+    """Make `spans` the target of span() in this thread/context (e.g. while one stage of a document runs)."""
+    tok = _CURRENT.set(spans)
+    try:
+        yield spans
+    finally:
+        _CURRENT.reset(tok)
+
+@contextmanager
+def span(name: str):
+    """Time a block into the current document's Spans; no-op outside a document."""
+    s = _CURRENT.get()
+    if s is None:
+        yield
+        return
+    with s.span(name):
+        yield
+
+class SpanSummary:
+    """
+    Run-wide percentiles per span, from a fixed-size reservoir sample per span
+    (seeded), so memory does not grow with the number of documents.
+    """
+    def __init__(self, reservoir: int = 10000, seed: int = 0):
+        self.k, self.rng = reservoir, random.Random(seed)
+        self.seen: Dict[str, int] = {}
+        self.total: Dict[str, List[float]] = {}
+        self.sample: Dict[str, List[tuple]] = {}
+
+    def add(self, timings: Dict[str, Dict]) -> None:
+        for name, t in timings.items():
+            w, c = t["wall_ms"], t["cpu_ms"]
+            n = self.seen[name] = self.seen.get(name, 0) + 1
+            tot = self.total.setdefault(name, [0.0, 0.0, 0.0, 0.0])  # sums, then maxima
+            tot[0] += w; tot[1] += c; tot[2] = max(tot[2], w); tot[3] = max(tot[3], c)
+            smp = self.sample.setdefault(name, [])
+            if len(smp) < self.k: smp.append((w, c))
+            else:
+                j = self.rng.randrange(n)
+                if j < self.k: smp[j] = (w, c)
+
+    @staticmethod
+    def _pct(xs: List[float], q: float) -> float:
+        return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+    def summary(self) -> Dict[str, Dict]:
+        out = {}
+        for name in sorted(self.sample):
+            n = self.seen[name]
+            row = {"docs": n}
+            for i, key in ((0, "wall_ms"), (1, "cpu_ms")):
+                xs = sorted(s[i] for s in self.sample[name])
+                row[key] = {"mean": round(self.total[name][i] / n, 3), "p50": self._pct(xs, 0.5),
+                            "p90": self._pct(xs, 0.9), "p99": self._pct(xs, 0.99), "max": self.total[name][2 + i],
+                            "total": round(self.total[name][i], 3)}
+            out[name] = row
+        return out
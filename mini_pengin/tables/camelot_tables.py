@@ -1,44 +1,40 @@
-import os
 from typing import Dict, List
 
+from ..schemas import TableItem
 from .tables_utils import clean_df, score_table
 
-def extract_tables_camelot(pdf_path: str, out_dir: str) -> Dict:
-    """Camelot extractor (lattice→stream). Cleans tables before writing CSVs."""
+def extract_tables_camelot(pdf_path: str, pages: str = "all") -> Dict:
+    """Camelot extractor (lattice→stream). Cleans and scores tables in memory.
+    pages: Camelot page spec, e.g. "all" or "1,4,7" (from the table gate)."""
     try:
         import camelot  # brew install ghostscript; pip install "camelot-py[cv]" opencv-python-headless pandas lxml
     except Exception as e:
-        return {"engine": "camelot", "error": f"camelot_not_available: {e}", "count": 0, "items": []}
+        return {"engine": "camelot", "error": f"camelot_not_available: {e}", "count": 0, "tables": []}
 
-    os.makedirs(out_dir, exist_ok=True)
-    items: List[Dict] = []
+    tables: List[TableItem] = []
 
-    def _dump(tables, flavor: str):
-        nonlocal items
-        for idx, t in enumerate(tables, 1):
+    def _collect(found, flavor: str):
+        for idx, t in enumerate(found, 1):
             df = clean_df(t.df)
             if df is None:
                 continue
-            stem = os.path.join(out_dir, f"camelot_{flavor}_{idx:02d}")
-            csv = stem + ".csv"
-            df.to_csv(csv, index=False)
             page = int(getattr(t, "page", 0) or 0)
-            items.append({"page": page, "path_html": None, "path_csv": csv})
+            tables.append(TableItem(engine="camelot", name=f"camelot_{flavor}_{idx:02d}", page=page, df=df, score=score_table(df)))
 
     # lattice first (ruled tables)
     try:
-        tbls = camelot.read_pdf(pdf_path, flavor="lattice", pages="all")
+        tbls = camelot.read_pdf(pdf_path, flavor="lattice", pages=pages)
         if len(tbls):
-            _dump(tbls, "lattice")
+            _collect(tbls, "lattice")
     except Exception:
         pass
 
     # stream second (borderless)
     try:
-        tbls = camelot.read_pdf(pdf_path, flavor="stream", pages="all")
+        tbls = camelot.read_pdf(pdf_path, flavor="stream", pages=pages)
         if len(tbls):
-            _dump(tbls, "stream")
+            _collect(tbls, "stream")
     except Exception:
         pass
 
-    return {"engine": "camelot", "count": len(items), "items": items}
+    return {"engine": "camelot", "count": len(tables), "tables": tables}
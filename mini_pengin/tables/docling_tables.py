@@ -1,18 +1,19 @@
 from __future__ import annotations
 from typing import Dict, List, Optional
 import os
+import threading
 import pandas as pd
 
+from ..schemas import TableItem
 from .tables_utils import clean_df, score_table
 
-def extract_tables_docling(pdf_path: str, out_dir: str) -> Dict:
-    """Docling-first extractor:
-    1) Run Docling with table structure ON (if pipeline options are available).
-    2) Export table objects from the structured graph.
-    3) Fallback: parse <table> nodes from full HTML export.
-    All outputs are cleaned and scored before writing CSVs.
-    """
-    os.makedirs(out_dir, exist_ok=True)
+_LOCAL = threading.local()
+
+def get_converter():
+    """One warm DocumentConverter per worker (thread or process); models load once."""
+    conv = getattr(_LOCAL, "conv", None)
+    if conv is not None:
+        return conv
 
     # Build converter (version-agnostic options)
     from docling.document_converter import DocumentConverter
@@ -27,11 +28,55 @@ def extract_tables_docling(pdf_path: str, out_dir: str) -> Dict:
         opts = None
 
     conv = DocumentConverter(pipeline_options=opts) if opts else DocumentConverter()
-    res = conv.convert(pdf_path)
-    doc = res.document
+    _LOCAL.conv = conv
+    return conv
+
+def _source(pdf):
+    """Path, or an in-memory DocumentStream when handed a DocSession (no second file read)."""
+    data = getattr(pdf, "data", None)
+    if data is None:
+        return pdf
+    from io import BytesIO
+    from docling.datamodel.base_models import DocumentStream
+    return DocumentStream(name=os.path.basename(pdf.path), stream=BytesIO(data))
+
+def convert_docling(pdf_path, page_range: Optional[tuple] = None):
+    """One Docling conversion on the worker's warm converter; returns the DoclingDocument.
+    page_range: optional 1-based inclusive (first, last) to convert only part of the PDF."""
+    conv = get_converter()
+    if page_range is not None:
+        try:
+            return conv.convert(_source(pdf_path), page_range=page_range).document
+        except TypeError:
+            pass  # older Docling without page_range: convert everything
+    return conv.convert(_source(pdf_path)).document
+
+def _page_no(item) -> Optional[int]:
+    prov = getattr(item, "prov", None) or []
+    return getattr(prov[0], "page_no", None) if prov else None
+
+def docling_page_texts(doc, num_pages: int) -> List[str]:
+    """Per-page text from a converted DoclingDocument, in reading order (one pass over items)."""
+    buckets: List[List[str]] = [[] for _ in range(num_pages)]
+    for item, _ in doc.iterate_items():
+        text = getattr(item, "text", None)
+        p = _page_no(item)
+        if text and p is not None and 1 <= p <= num_pages:
+            buckets[p - 1].append(text)
+    return ["\n".join(b) for b in buckets]
+
+def extract_tables_docling(pdf_path, doc=None, page_range: Optional[tuple] = None) -> Dict:
+    """Docling-first extractor:
+    1) Run Docling with table structure ON (if pipeline options are available).
+    2) Export table objects from the structured graph.
+    3) Fallback: parse <table> nodes from full HTML export.
+    pdf_path may also be a DocSession; pass an already converted `doc` to skip conversion.
+    All tables are cleaned and scored in memory; finalize_tables writes them.
+    """
+    if doc is None:
+        doc = convert_docling(pdf_path, page_range=page_range)
 
-    items: List[Dict] = []
-    best: List[tuple[float, str]] = []
+    tables: List[TableItem] = []
 
     # 1) Prefer structured table objects if present
     for i, tbl in enumerate(getattr(doc, "tables", []) or [], 1):
@@ -42,23 +87,16 @@ def extract_tables_docling(pdf_path: str, out_dir: str) -> Dict:
         df = clean_df(raw_df)
         if df is None:
             continue
-        stem = os.path.join(out_dir, f"table_{i:02d}")
-        csv_path = stem + ".csv"
-        df.to_csv(csv_path, index=False)
-        # save HTML snippet if available
-        html_path = None
+        # keep the HTML snippet if available
+        html = None
         try:
             html = tbl.export_to_html(doc=doc)
-            html_path = stem + ".html"
-            with open(html_path, "w", encoding="utf-8") as f:
-                f.write(html)
         except Exception:
             pass
-        items.append({"page": getattr(tbl, "page", None), "path_html": html_path, "path_csv": csv_path})
-        best.append((score_table(df), csv_path))
+        tables.append(TableItem(engine="docling", name=f"table_{i:02d}", page=_page_no(tbl), df=df, score=score_table(df), html=html))
 
     # 2) Fallback: parse <table> nodes from full HTML export (version-agnostic)
-    if not items:
+    if not tables:
         to_html = getattr(doc, "export_to_html", None) or getattr(doc, "export_html", None)
         html_all = to_html() if callable(to_html) else ""
         if html_all:
@@ -75,14 +113,8 @@ def extract_tables_docling(pdf_path: str, out_dir: str) -> Dict:
                     df = clean_df(dfs[0])
                     if df is None:
                         continue
-                    stem = os.path.join(out_dir, f"table_html_{k:02d}")
-                    csv_path = stem + ".csv"
-                    df.to_csv(csv_path, index=False)
-                    with open(stem + ".html", "w", encoding="utf-8") as f:
-                        f.write(str(node))
-                    items.append({"page": None, "path_html": stem + ".html", "path_csv": csv_path})
-                    best.append((score_table(df), csv_path))
+                    tables.append(TableItem(engine="docling", name=f"table_html_{k:02d}", df=df, score=score_table(df), html=str(node)))
             except Exception:
                 pass
 
-    return {"engine": "docling", "count": len(items), "items": items}
+    return {"engine": "docling", "count": len(tables), "tables": tables}
@@ -1,5 +1,4 @@
-import os
-import pandas as pd
+from ..schemas import TableItem
 
 __all__ = ["extract_tables_from_markdown_pages", "_extract_md_tables"]
 
@@ -27,15 +26,16 @@ def _extract_md_tables(md: str):
         i += 1
     return tables
 
-def extract_tables_from_markdown_pages(page_markdowns, out_dir: str):
+def extract_tables_from_markdown_pages(page_markdowns, pages=None):
     """
-    Parse Markdown pipe tables from OCR (DeepSeek) page outputs.
-    Writes page-scoped .md and .csv files under out_dir.
-    Returns {"engine": "markdown", "count": N, "items": [...]}
+    Parse Markdown pipe tables from OCR (DeepSeek) page outputs into in-memory tables
+    (Markdown source + parsed DataFrame when pandas can read it).
+    pages: optional set of 1-based page numbers to parse (others are skipped).
+    Returns {"engine": "markdown", "count": N, "tables": [...]}
     """
-    os.makedirs(out_dir, exist_ok=True)
-    items = []
-    count = 0
+    import pandas as pd  # here, not at module level: table_gate uses _extract_md_tables on every run
+    from .tables_utils import score_table
+    tables = []
 
     # Optional MD→HTML converter to help pandas.read_html
     try:
@@ -44,25 +44,20 @@ def extract_tables_from_markdown_pages(page_markdowns, out_dir: str):
         mdlib = None
 
     for i, md in enumerate(page_markdowns, 1):
-        tables = _extract_md_tables(md)
-        for k, tmd in enumerate(tables, 1):
-            base = os.path.join(out_dir, f"page_{i:04d}_table_{k:02d}")
-            md_path = base + ".md"
-            with open(md_path, "w", encoding="utf-8") as f:
-                f.write(tmd)
-
+        if pages is not None and i not in pages:
+            continue
+        for k, tmd in enumerate(_extract_md_tables(md), 1):
             html = mdlib.markdown(tmd) if mdlib is not None else None
 
-            csv_path = None
+            df = None
             try:
                 dfs = pd.read_html(html if html is not None else tmd)
                 if dfs:
-                    csv_path = base + ".csv"
-                    dfs[0].to_csv(csv_path, index=False)
+                    df = dfs[0]
             except Exception:
                 pass
 
-            items.append({"page": i, "path_md": md_path, "path_html": None, "path_csv": csv_path})
-            count += 1
+            tables.append(TableItem(engine="markdown", name=f"page_{i:04d}_table_{k:02d}", page=i, df=df,
+                                    score=score_table(df) if df is not None else 0.0, md=tmd))
 
-    return {"engine": "markdown", "count": count, "items": items}
+    return {"engine": "markdown", "count": len(tables), "tables": tables}
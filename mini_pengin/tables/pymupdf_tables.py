@@ -0,0 +1,30 @@
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from ..schemas import TableItem
+from .tables_utils import clean_df, score_table
+
+def extract_tables_pymupdf(session, pages: Optional[Iterable[int]] = None) -> Dict:
+    """PyMuPDF table finder on the session's already-open document (no models, no second parse).
+    pages: optional 1-based page numbers (e.g. table-gate candidates); default all pages.
+    Tables are cleaned and scored in memory; finalize_tables writes them."""
+    tables: List[TableItem] = []
+    for pno in (pages if pages is not None else range(1, len(session) + 1)):
+        page = session.doc[pno - 1]
+        try:
+            found = page.find_tables()
+        except Exception:
+            continue
+        for k, tbl in enumerate(found.tables, 1):
+            try:
+                # header row stays in the body so clean_df promotes it like for the other engines
+                df = clean_df(pd.DataFrame(tbl.extract()))
+                if df is None:
+                    continue
+                score = score_table(df)
+            except Exception:
+                continue  # one malformed table never fails the document
+            tables.append(TableItem(engine="pymupdf", name=f"pymupdf_p{pno:04d}_{k:02d}", page=pno, df=df, score=score))
+    best = max((t.score for t in tables), default=0.0)
+    return {"engine": "pymupdf", "count": len(tables), "tables": tables, "best_score": round(float(best), 3)}
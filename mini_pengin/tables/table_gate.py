@@ -0,0 +1,66 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from .ocr_md_tables import _extract_md_tables
+
+UNKNOWN = 0.5  # scanned page without OCR markdown: no cheap evidence either way
+
+def _ruling_score(page) -> float:
+    """Vector ruling lines: a grid (>=3 horizontal + >=2 vertical) or booktabs-style rules."""
+    h = v = 0
+    for d in page.get_drawings():
+        for it in d.get("items", ()):
+            if it[0] == "l":
+                p1, p2 = it[1], it[2]
+                if abs(p1.y - p2.y) < 1 and abs(p1.x - p2.x) > 20: h += 1
+                elif abs(p1.x - p2.x) < 1 and abs(p1.y - p2.y) > 10: v += 1
+            elif it[0] == "re":
+                r = it[1]
+                if r.height < 2 and r.width > 20: h += 1
+                elif r.width < 2 and r.height > 10: v += 1
+                elif r.width > 20 and r.height > 10: h += 2; v += 2  # cell/box outlines
+    if h >= 3 and v >= 2: return 1.0
+    if h >= 3: return 0.6
+    return 0.0
+
+def _column_score(page, gap: float = 15.0, bucket: float = 6.0) -> float:
+    """Aligned text columns: rows split into >=3 cells by wide gaps that share cell x-positions."""
+    lines: Dict[tuple, list] = defaultdict(list)
+    for w in page.get_text("words"):
+        lines[(w[5], w[6])].append(w)
+    rows: List[set] = []
+    for ws in lines.values():
+        ws.sort(key=lambda w: w[0])
+        starts = [ws[0][0]]
+        for a, b in zip(ws, ws[1:]):
+            if b[0] - a[2] > gap: starts.append(b[0])
+        if len(starts) >= 3:
+            rows.append({round(x / bucket) for x in starts})
+    if len(rows) < 3:
+        return 0.0
+    c = Counter(x for r in rows for x in r)
+    shared = {x for x, n in c.items() if n >= 3}
+    aligned = sum(1 for r in rows if len(r & shared) >= 2)
+    return min(1.0, aligned / 4.0)
+
+def page_table_scores(session, page_markdowns: Optional[List[str]] = None) -> List[float]:
+    """Table-likelihood in [0, 1] per page from data PyMuPDF already exposes."""
+    scores: List[float] = []
+    for i in range(len(session)):
+        md = page_markdowns[i] if page_markdowns and i < len(page_markdowns) else ""
+        if md:
+            scores.append(1.0 if _extract_md_tables(md) else 0.0)
+            continue
+        if len(session.page_text(i)) <= 40 and session.page_images(i):
+            scores.append(UNKNOWN)
+            continue
+        page = session.doc[i]
+        s = _ruling_score(page)
+        if s < 1.0:
+            s = max(s, _column_score(page))
+        scores.append(s)
+    return scores
+
+def candidate_pages(scores: List[float], threshold: float = 0.5) -> List[int]:
+    """1-based page numbers worth handing to the table engines."""
+    return [i + 1 for i, s in enumerate(scores) if s >= threshold]
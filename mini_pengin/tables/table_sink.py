@@ -0,0 +1,141 @@
+import os, threading, time, itertools
+from typing import Dict, List, Optional
+
+from ..schemas import TableItem
+
+def write_table_files(tables: List[TableItem], out_dir: str) -> List[Dict]:
+    """Per-document files (CSV + optional HTML/Markdown); returns docmeta items."""
+    os.makedirs(out_dir, exist_ok=True)
+    items: List[Dict] = []
+    for t in tables:
+        stem = os.path.join(out_dir, t.name)
+        it: Dict = {"page": t.page, "path_html": None, "path_csv": None, "score": round(float(t.score), 3)}
+        if t.md is not None:
+            it["path_md"] = stem + ".md"
+            with open(stem + ".md", "w", encoding="utf-8") as f:
+                f.write(t.md)
+        if t.df is not None:
+            it["path_csv"] = stem + ".csv"
+            t.df.to_csv(stem + ".csv", index=False)
+        if t.html is not None:
+            it["path_html"] = stem + ".html"
+            with open(stem + ".html", "w", encoding="utf-8") as f:
+                f.write(t.html)
+        items.append(it)
+    return items
+
+_GEN = itertools.count()  # sinks opened in this process; later ones get a suffix
+_COLUMNS = ["doc_id", "table", "engine", "page", "score", "row", "col", "header", "value"]
+
+class ColumnarTableSink:
+    """
+    One append-only, cell-level ("long") table file per run and process:
+    doc_id, table, engine, page, score, row, col, header, value.
+    Parquet when pyarrow is installed (one row group per document), else CSV.
+    Loaders read a single file instead of thousands of tiny CSVs.
+    roll_secs > 0 closes the Parquet file that often and continues in
+    tables-<run>-<pid>-pNNNN.parquet, so long-lived processes have readable parts.
+    """
+    def __init__(self, outdir: str, roll_secs: float = 0.0):
+        try:
+            import pyarrow as pa, pyarrow.parquet as pq
+        except Exception:
+            pa = pq = None
+        self._pa, self._pq = pa, pq
+        gen = next(_GEN)  # a sink reopened after close_sinks() never overwrites an earlier file
+        run = time.strftime("%Y%m%dT%H%M%S") + (f"_{gen}" if gen else "")
+        self._stem = os.path.join(outdir, f"tables-{run}-{os.getpid()}")
+        self._ext = "parquet" if pq else "csv"
+        self.path = f"{self._stem}.{self._ext}"
+        self.roll_secs, self._part, self._opened = roll_secs, 0, time.monotonic()
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def append(self, doc_id: str, tables: List[TableItem]) -> List[Dict]:
+        cols: Dict[str, list] = {c: [] for c in _COLUMNS}
+        items: List[Dict] = []
+        for k, t in enumerate(tables):
+            items.append({"page": t.page, "table": k, "score": round(float(t.score), 3)})
+            if t.df is None:
+                continue
+            headers = [str(h) for h in t.df.columns]
+            for r, row in enumerate(t.df.itertuples(index=False)):
+                for c, v in enumerate(row):
+                    cols["doc_id"].append(doc_id); cols["table"].append(k); cols["engine"].append(t.engine)
+                    cols["page"].append(t.page); cols["score"].append(float(t.score))
+                    cols["row"].append(r); cols["col"].append(c); cols["header"].append(headers[c])
+                    cols["value"].append(None if v is None or v != v else str(v))
+        with self._lock:
+            if cols["doc_id"]:
+                self._write(cols)
+            path = self.path
+        for it in items: it["path_columnar"] = path
+        return items
+
+    def _roll(self) -> None:
+        # Parquet is unreadable until its footer is written: long-lived processes
+        # (serve) close the current part every roll_secs and continue in a new one.
+        self._writer.close()
+        self._writer = None
+        self._part += 1
+        self.path = f"{self._stem}-p{self._part:04d}.{self._ext}"
+
+    def _write(self, cols: Dict[str, list]) -> None:
+        if self._pq is not None:
+            if self._writer is not None and self.roll_secs > 0 and time.monotonic() - self._opened >= self.roll_secs:
+                self._roll()
+            batch = self._pa.table(cols)
+            if self._writer is None:
+                self._writer = self._pq.ParquetWriter(self.path, batch.schema)
+                self._opened = time.monotonic()
+            self._writer.write_table(batch)
+            return
+        import csv
+        new = not os.path.exists(self.path)
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            if new: w.writerow(_COLUMNS)
+            w.writerows(zip(*(cols[c] for c in _COLUMNS)))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()  # Parquet footer
+                self._writer = None
+
+_SINKS: Dict[str, ColumnarTableSink] = {}
+_SINKS_LOCK = threading.Lock()
+
+def get_sink(outdir: str, roll_secs: float = 0.0) -> ColumnarTableSink:
+    """Process-wide sink for `outdir`, closed at process exit (pool workers included)."""
+    with _SINKS_LOCK:
+        sink = _SINKS.get(outdir)
+        if sink is None:
+            sink = _SINKS[outdir] = ColumnarTableSink(outdir, roll_secs)
+            import atexit
+            from multiprocessing import util
+            atexit.register(sink.close)
+            util.Finalize(sink, sink.close, exitpriority=10)
+        return sink
+
+def close_sinks() -> None:
+    with _SINKS_LOCK:
+        while _SINKS: _SINKS.popitem()[1].close()
+
+def finalize_tables(meta: Dict, doc_id: str, tdir: str, outdir: str, fmt: str = "files", roll_secs: float = 0.0) -> Dict:
+    """Write in-memory tables once (files or columnar) and turn them into JSON-able docmeta."""
+    tables: Optional[List[TableItem]] = meta.pop("tables", None)
+    if tables is None:
+        return meta  # already written (e.g. reused from a previous run)
+    if fmt == "columnar":
+        meta["items"] = get_sink(outdir, roll_secs).append(doc_id, tables) if tables else []
+    else:
+        meta["items"] = write_table_files(tables, tdir) if tables else []
+    if tables:
+        k = max(range(len(tables)), key=lambda i: tables[i].score)
+        if tables[k].score > 0:
+            best = meta["items"][k]
+            meta["best_score"] = round(float(tables[k].score), 3)
+            if best.get("path_csv"): meta["best_csv"] = best["path_csv"]
+            else: meta["best_table"] = k
+    return meta
@@ -3,7 +3,8 @@ import re
 
 def clean_df(df: pd.DataFrame, min_rows: int = 2, min_cols: int = 2) -> pd.DataFrame | None:
     # 1) strip whitespace
-    df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+    elementwise = getattr(df, "map", None) or df.applymap  # applymap is gone in pandas 3
+    df = elementwise(lambda x: x.strip() if isinstance(x, str) else x)
 
     # 2) drop all-empty rows/cols  (FinePDFs does this)
     df = df.dropna(how="all").dropna(axis=1, how="all")
@@ -20,8 +21,13 @@ def clean_df(df: pd.DataFrame, min_rows: int = 2, min_cols: int = 2) -> pd.DataF
         df.columns = [str(x) if pd.notna(x) else "" for x in df.iloc[0]]
         df = df.iloc[1:].reset_index(drop=True)
 
-    # 4) normalize header names
-    df.columns = [re.sub(r"\s+", " ", str(c)).strip() for c in df.columns]
+    # 4) normalize header names; repeated names get a suffix so df[c] stays one column
+    seen = {}
+    cols = []
+    for c in (re.sub(r"\s+", " ", str(c)).strip() for c in df.columns):
+        seen[c] = seen.get(c, 0) + 1
+        cols.append(c if seen[c] == 1 else f"{c}_{seen[c]}")
+    df.columns = cols
 
     # 5) normalize numeric columns (comma→dot) where safe
     for c in df.columns:
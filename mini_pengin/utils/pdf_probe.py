@@ -1,22 +1,36 @@
 from dataclasses import dataclass
-import fitz
 
 @dataclass
 class PageCheck:
     index: int
     chars: int
     images: int
+    img_dpi: float = 0.0  # effective resolution of the largest embedded image (0 = none)
 
-def probe_pdf(path: str, max_pages: int = 12):
-    doc = fitz.open(path)
-    n = len(doc)
+def image_dpi(page, images=None) -> float:
+    """Effective DPI of the page's largest embedded image, from its pixel size vs placed size."""
+    best = 0.0
+    for img in (page.get_images(full=True) if images is None else images):
+        xref, w, h = img[0], img[2], img[3]
+        try: rects = page.get_image_rects(xref)
+        except Exception: rects = []
+        for r in rects:
+            if r.width <= 0 or r.height <= 0: continue
+            best = max(best, min(w / (r.width / 72.0), h / (r.height / 72.0)))
+    return best
+
+def probe_pdf(src, max_pages: int = 12):
+    """src: a path or an open DocSession (whose page text cache the probe then warms)."""
+    from ..doc_session import DocSession
+    if isinstance(src, str):
+        with DocSession(src) as s:
+            return probe_pdf(s, max_pages=max_pages)
+    n = len(src)
     step = max(1, n // max_pages)
     pages = []
     for i in range(0, n, step):
         if len(pages) >= max_pages: break
-        p = doc[i]
-        txt = p.get_text("text") or ""
-        imgs = len(p.get_images(full=True))
-        pages.append(PageCheck(index=i, chars=len(txt), images=imgs))
-    doc.close()
+        txt = src.page_text(i)
+        ims = src.page_images(i)
+        pages.append(PageCheck(index=i, chars=len(txt), images=len(ims), img_dpi=image_dpi(src.doc[i], ims) if ims else 0.0))
     return n, pages
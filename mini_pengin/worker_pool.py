@@ -0,0 +1,61 @@
+import concurrent.futures
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from .config import ForgeConfig
+from .forge_runner import run_on_pdf, warm_engines, StageError
+from .run_manifest import RunManifest
+
+# Per-process worker state, set once by the pool initializer.
+_CFG: Optional[ForgeConfig] = None
+_OUT: Optional[str] = None
+_MANIFEST: Optional[RunManifest] = None
+
+def _init_worker(cfg: ForgeConfig, outdir: str, use_manifest: bool) -> None:
+    global _CFG, _OUT, _MANIFEST
+    _CFG, _OUT = cfg, outdir
+    # Read-only snapshot for skip decisions; only the parent appends to the manifest.
+    _MANIFEST = RunManifest(outdir) if use_manifest else None
+    warm_engines(cfg)
+
+def _run_one(path: str) -> Dict:
+    return run_on_pdf(path, _OUT, _CFG, _MANIFEST)
+
+def make_executor(cfg: ForgeConfig, outdir: str, manifest: Optional[RunManifest]):
+    """
+    Returns (executor, submit) where submit(path) -> Future[result dict].
+    thread : one shared process, engines shared across threads.
+    process: each worker process warms its own engines once and serves many PDFs;
+             results stream back to the parent as futures complete.
+    """
+    if cfg.executor == "process":
+        ex = concurrent.futures.ProcessPoolExecutor(
+            max_workers=cfg.workers, initializer=_init_worker, initargs=(cfg, outdir, manifest is not None))
+        return ex, lambda p: ex.submit(_run_one, p)
+    ex = concurrent.futures.ThreadPoolExecutor(max_workers=cfg.workers)
+    return ex, lambda p: ex.submit(run_on_pdf, p, outdir, cfg, manifest)
+
+def run_all(paths: Iterable[str], outdir: str, cfg: ForgeConfig,
+            manifest: Optional[RunManifest] = None) -> Iterator[Tuple[str, object]]:
+    """Yields (path, result dict | StageError) in completion order for any --executor."""
+    if cfg.executor == "lanes":
+        from .lanes import LanePipeline
+        yield from LanePipeline(outdir, cfg, manifest).run(paths)
+        return
+    ex, submit = make_executor(cfg, outdir, manifest)
+    # At most `limit` futures exist at a time; paths are pulled from the (streaming)
+    # iterable only as slots free up, so memory does not grow with the corpus.
+    limit = cfg.max_inflight or 4 * max(1, cfg.workers)
+    it, futs = iter(paths), {}
+    with ex:
+        while True:
+            while len(futs) < limit:
+                p = next(it, None)
+                if p is None: break
+                futs[submit(p)] = p
+            if not futs:
+                return
+            done, _ = concurrent.futures.wait(futs, return_when=concurrent.futures.FIRST_COMPLETED)
+            for f in done:
+                p = futs.pop(f)
+                try: yield p, f.result()
+                except StageError as e: yield p, e
+                except Exception as e: yield p, StageError(p, "worker", type(e).__name__, str(e))  # e.g. a dead process
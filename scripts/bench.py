@@ -0,0 +1,162 @@
+"""
+Benchmark mini-pengin over a corpus at several settings and compare with a stored baseline.
+
+  python scripts/bench.py --corpus bench_corpus --generate "--docs 200 --pages lognormal:1.5:1.0:300" \
+      --workers 1,4 --tables off,auto --ocr auto --baseline bench_baseline.json
+
+Each setting runs `python -m mini_pengin` in a fresh output directory and reports
+docs/s, pages/s, per-stage p50/p95 wall latency (from the per-document timings on
+the result lines) and the peak RSS of the run, worker processes included. With
+--save-baseline the report becomes the baseline; otherwise each setting already in
+the baseline is compared with it, and the exit code is 1 if anything regressed by
+more than --tolerance. Runs offline: without DeepSeek-OCR weights, OCR settings
+use --ocr stub.
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import argparse
+import tempfile
+import itertools
+import subprocess
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ("route", "extract", "tables", "post")
+HIGHER_IS_BETTER = ("docs_per_s", "pages_per_s")
+DEFAULT_CHECK = "docs_per_s,pages_per_s,peak_rss_mb"
+MIN_DELTA_MS = 5.0  # stage latencies: ignore changes smaller than this (timer and scheduling noise)
+
+def ocr_weights_available():
+    """torch + transformers importable and DeepSeek-OCR in the local Hugging Face cache."""
+    if not all(importlib.util.find_spec(m) for m in ("torch", "transformers")):
+        return False
+    hub = os.environ.get("HF_HUB_CACHE") or os.environ.get("HUGGINGFACE_HUB_CACHE") or \
+        os.path.join(os.environ.get("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "hub")
+    return os.path.isdir(os.path.join(hub, "models--deepseek-ai--DeepSeek-OCR", "snapshots"))
+
+def pct(xs, q):
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(q * len(xs)))], 3) if xs else None
+
+def run_once(corpus, workers, tables, ocr, extra):
+    out = tempfile.mkdtemp(prefix="mini_pengin_bench_")
+    cmd = [sys.executable, "-m", "mini_pengin", "--input", corpus, "--out", out, "--force", "--progress", "0",
+           "--results", "ndjson", "--workers", str(workers), "--tables", tables, "--ocr", ocr] + extra
+    t0 = time.perf_counter()
+    p = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    lines = p.stdout.read().splitlines()
+    # wait4 reports this child's peak RSS, including the worker processes it reaped
+    _, status, ru = os.wait4(p.pid, 0)
+    p.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - t0
+    shutil.rmtree(out, ignore_errors=True)
+    results, errors = [], 0
+    for l in lines:
+        r = json.loads(l)
+        if "doc_id" in r: results.append(r)
+        else: errors += 1
+    if p.returncode != 0:
+        raise SystemExit(f"run failed ({p.returncode}): {shlex.join(cmd)}")
+    rss = ru.ru_maxrss / (1 << 20) if sys.platform == "darwin" else ru.ru_maxrss / 1024  # bytes on macOS, KiB elsewhere
+    return {"wall_s": wall, "docs": len(results), "errors": errors, "pages": sum(r["pages"] for r in results),
+            "peak_rss_mb": round(rss, 1), "timings": [r.get("timings", {}) for r in results]}
+
+def measure(corpus, workers, tables, ocr, extra, repeat):
+    runs = sorted((run_once(corpus, workers, tables, ocr, extra) for _ in range(repeat)), key=lambda r: r["wall_s"])
+    r = runs[len(runs) // 2]  # median run by wall time
+    row = {"docs": r["docs"], "pages": r["pages"], "errors": r["errors"], "wall_s": round(r["wall_s"], 3),
+           "docs_per_s": round(r["docs"] / r["wall_s"], 3), "pages_per_s": round(r["pages"] / r["wall_s"], 3),
+           "peak_rss_mb": max(x["peak_rss_mb"] for x in runs)}
+    for st in STAGES + ("total",):
+        if st == "total":
+            xs = [sum(t[s]["wall_ms"] for s in STAGES if s in t) for t in r["timings"]]
+        else:
+            xs = [t[st]["wall_ms"] for t in r["timings"] if st in t]
+        row[f"{st}_p50_ms"], row[f"{st}_p95_ms"] = pct(xs, 0.5), pct(xs, 0.95)
+    return row
+
+def compare(report, baseline, tolerance, check):
+    """Checked metrics worse than the baseline by more than tolerance (relative)."""
+    out = []
+    for name, row in report["settings"].items():
+        base = baseline.get("settings", {}).get(name)
+        if base is None:
+            continue
+        for k, new in row.items():
+            old = base.get(k)
+            if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+                continue
+            if not (k in check or ("all" in check and (k in HIGHER_IS_BETTER or k.endswith("_ms") or k == "peak_rss_mb"))):
+                continue
+            if k.endswith("_ms") and new - old < MIN_DELTA_MS:
+                continue
+            change = (new - old) / old
+            if (-change if k in HIGHER_IS_BETTER else change) > tolerance:
+                out.append({"setting": name, "metric": k, "baseline": old, "current": new, "change": round(change, 3)})
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="mini-pengin throughput benchmark with baseline regression check")
+    ap.add_argument("--corpus", required=True, help="directory of PDFs (see scripts/generate_synthetic.py --docs)")
+    ap.add_argument("--generate", default=None, help="generate_synthetic.py arguments to create --corpus if missing")
+    ap.add_argument("--workers", default="1,4")
+    ap.add_argument("--tables", default="off,auto")
+    ap.add_argument("--ocr", default="auto", help="comma-separated --ocr values")
+    ap.add_argument("--ocr-stub", choices=["auto","on","off"], default="auto",
+                    help="auto: replace OCR engines with --ocr stub when DeepSeek-OCR weights are not present")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per setting; the median is reported")
+    ap.add_argument("--extra", default="", help="more mini_pengin arguments for every run, e.g. \"--executor process\"")
+    ap.add_argument("--baseline", default=None, help="baseline JSON to compare with (or to write with --save-baseline)")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown before flagging a regression")
+    ap.add_argument("--check", default=DEFAULT_CHECK,
+                    help="metrics that can fail the comparison, or 'all' to include the per-stage p50/p95 latencies")
+    ap.add_argument("--report", default=None, help="also write this run's report JSON here")
+    a = ap.parse_args()
+
+    if not os.path.isdir(a.corpus):
+        if a.generate is None:
+            raise SystemExit(f"corpus not found: {a.corpus} (pass --generate to create it)")
+        subprocess.check_call([sys.executable, os.path.join(ROOT, "scripts", "generate_synthetic.py"),
+                               "--out", a.corpus] + shlex.split(a.generate))
+    corpus = os.path.abspath(a.corpus)
+    stub = a.ocr_stub == "on" or (a.ocr_stub == "auto" and not ocr_weights_available())
+    extra = shlex.split(a.extra)
+
+    report = {"corpus": corpus, "ocr_stub": stub, "python": sys.version.split()[0], "settings": {}}
+    meta = os.path.join(corpus, "corpus.json")
+    if os.path.exists(meta):
+        with open(meta, "r", encoding="utf-8") as f:
+            report["corpus_params"] = json.load(f)["params"]
+    for w, t, o in itertools.product(a.workers.split(","), a.tables.split(","), a.ocr.split(",")):
+        ocr = "stub" if stub and o in ("auto", "deepseek", "tesseract") else o
+        name = f"workers={w} tables={t} ocr={ocr}" + (f" {a.extra}" if a.extra else "")
+        row = measure(corpus, int(w), t, ocr, extra, max(1, a.repeat))
+        report["settings"][name] = row
+        print(f"{name:<40} {row['docs_per_s']:8.2f} docs/s {row['pages_per_s']:9.1f} pages/s  "
+              f"p50/p95 " + " ".join(f"{s} {row[s + '_p50_ms']}/{row[s + '_p95_ms']}" for s in STAGES) +
+              f" ms  rss {row['peak_rss_mb']} MB" + (f"  errors {row['errors']}" if row["errors"] else ""), flush=True)
+
+    if a.report:
+        with open(a.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if a.baseline and a.save_baseline:
+        with open(a.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {a.baseline}")
+        return
+    if a.baseline:
+        with open(a.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), a.tolerance, set(a.check.split(",")))
+        for r in regressions:
+            print(f"[REGRESSION] {r['setting']}: {r['metric']} {r['baseline']} -> {r['current']} ({r['change']:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 
 import os
+import io
+import json
+import math
+import random
+import argparse
 import fitz  # PyMuPDF
 from PIL import Image, ImageDraw, ImageFont
 
@@ -141,14 +146,141 @@ def create_table_doc(path):
     doc.save(path)
     print(f"Created table doc: {path}")
 
+# ---------------------------------------------------------------------------
+# Parameterized corpora for throughput / scaling benchmarks (scripts/bench.py)
+# ---------------------------------------------------------------------------
+
+WORDS = ("the of and to in is for on that with as by this are from at be or an it we not which data system "
+         "report results model analysis table value process time year total market cost revenue growth customer "
+         "service product quality research method sample section figure page number level rate group policy "
+         "energy water health public review annual summary project budget risk performance index").split()
+
+def sample_pages(spec, rng):
+    """Page count from a spec: fixed:N | uniform:A:B | lognormal:MU:SIGMA[:MAX]."""
+    kind, *args = spec.split(":")
+    if kind == "fixed":
+        return int(args[0])
+    if kind == "uniform":
+        return rng.randint(int(args[0]), int(args[1]))
+    if kind == "lognormal":
+        cap = int(args[2]) if len(args) > 2 else 2000
+        return max(1, min(cap, int(round(rng.lognormvariate(float(args[0]), float(args[1]))))))
+    raise ValueError(f"unknown page distribution: {spec}")
+
+def parse_mix(spec):
+    """native=0.7,scanned=0.2,mixed=0.1 -> normalized weights."""
+    mix = {k: float(v) for k, v in (kv.split("=") for kv in spec.split(","))}
+    bad = set(mix) - {"native", "scanned", "mixed"}
+    if bad:
+        raise ValueError(f"unknown document kinds: {sorted(bad)}")
+    total = sum(mix.values())
+    return {k: v / total for k, v in mix.items()}
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def _draw_table(page, rng, y0):
+    rows, cols = rng.randint(3, 8), rng.randint(3, 5)
+    x0, cw, rh = 50, 500 / cols, 22
+    for i in range(rows + 1):
+        page.draw_line((x0, y0 + i * rh), (x0 + cols * cw, y0 + i * rh))
+    for j in range(cols + 1):
+        page.draw_line((x0 + j * cw, y0), (x0 + j * cw, y0 + rows * rh))
+    for i in range(rows):
+        for j in range(cols):
+            cell = rng.choice(WORDS).capitalize() if i == 0 or j == 0 else f"{rng.uniform(0, 1000):.1f}"
+            page.insert_text((x0 + j * cw + 5, y0 + i * rh + 15), cell, fontsize=10)
+    return y0 + rows * rh + 20
+
+def _native_page(doc, rng, title, pno, lines, table):
+    page = doc.new_page()
+    # Running header/footer, so boilerplate removal has something to do
+    page.insert_text((50, 30), f"{title} - Confidential", fontsize=9)
+    page.insert_text((280, 820), f"Page {pno}", fontsize=9)
+    y = 60
+    if table:
+        y = _draw_table(page, rng, y)
+    n = max(0, min(lines, int((800 - y) / 14)))
+    if n:
+        body = "\n".join(_sentence(rng, rng.randint(6, 12)) for _ in range(n))
+        page.insert_text((50, y), body, fontsize=10, lineheight=1.2)
+    return page
+
+def _scan_page(doc, src, dpi=100):
+    # Rasterize a native page into a JPEG-only page, like a flatbed scan
+    pix = src.get_pixmap(matrix=fitz.Matrix(dpi / 72.0, dpi / 72.0), colorspace=fitz.csGRAY)
+    img = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=60)
+    page = doc.new_page(width=src.rect.width, height=src.rect.height)
+    page.insert_image(page.rect, stream=buf.getvalue())
+
+def create_synthetic_doc(path, rng, kind, n_pages, table_density, text_density):
+    """One document; returns its ground-truth description."""
+    title = f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS).capitalize()} Report"
+    lines = max(0, int(round(45 * text_density)))
+    doc, scratch = fitz.open(), fitz.open()
+    scanned, tables = [], []
+    for pno in range(1, n_pages + 1):
+        table = rng.random() < table_density
+        scan = kind == "scanned" or (kind == "mixed" and rng.random() < 0.5)
+        if table:
+            tables.append(pno)
+        if scan:
+            scanned.append(pno)
+            _scan_page(doc, _native_page(scratch, rng, title, pno, lines, table))
+            scratch.delete_page(0)
+        else:
+            _native_page(doc, rng, title, pno, lines, table)
+    # Fixed dates and no /ID: the same seed gives byte-identical files (and sha256-stable doc_ids)
+    doc.set_metadata({"title": title, "creationDate": "D:20240101000000", "modDate": "D:20240101000000"})
+    doc.save(path, garbage=1, deflate=True, no_new_id=True)
+    doc.close(); scratch.close()
+    return {"file": os.path.basename(path), "kind": kind, "pages": n_pages, "scanned_pages": scanned, "table_pages": tables}
+
+def generate_corpus(out_dir, docs, pages="lognormal:1.5:1.0:300", mix="native=0.7,scanned=0.2,mixed=0.1",
+                    table_density=0.2, text_density=1.0, seed=0):
+    """docs PDFs plus corpus.json (parameters and per-document ground truth). Same seed, same corpus."""
+    ensure_dir(out_dir)
+    rng = random.Random(seed)
+    weights = parse_mix(mix)
+    kinds, probs = list(weights), list(weights.values())
+    width = max(5, int(math.log10(max(docs, 1))) + 1)
+    entries = []
+    for i in range(docs):
+        kind = rng.choices(kinds, probs)[0]
+        n = sample_pages(pages, rng)
+        doc_rng = random.Random(rng.getrandbits(64))
+        path = os.path.join(out_dir, f"syn_{i:0{width}d}_{kind}.pdf")
+        entries.append(create_synthetic_doc(path, doc_rng, kind, n, table_density, text_density))
+    meta = {"params": {"docs": docs, "pages": pages, "mix": mix, "table_density": table_density,
+                       "text_density": text_density, "seed": seed},
+            "total_pages": sum(e["pages"] for e in entries), "docs": entries}
+    with open(os.path.join(out_dir, "corpus.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"Created {docs} PDFs ({meta['total_pages']} pages) in '{out_dir}/'")
+    return meta
+
 def main():
-    out_dir = "in_synthetic"
+    ap = argparse.ArgumentParser(description="Synthetic PDFs: the three samples, or a parameterized corpus with --docs")
+    ap.add_argument("--docs", type=int, default=0, help="number of documents (0 = the three sample PDFs)")
+    ap.add_argument("--out", default="in_synthetic")
+    ap.add_argument("--pages", default="lognormal:1.5:1.0:300", help="fixed:N | uniform:A:B | lognormal:MU:SIGMA[:MAX]")
+    ap.add_argument("--mix", default="native=0.7,scanned=0.2,mixed=0.1", help="document kind weights")
+    ap.add_argument("--table-density", type=float, default=0.2, help="probability that a page has a ruled table")
+    ap.add_argument("--text-density", type=float, default=1.0, help="body text per page, 1.0 = about 45 lines")
+    ap.add_argument("--seed", type=int, default=0)
+    a = ap.parse_args()
+    if a.docs > 0:
+        generate_corpus(a.out, a.docs, a.pages, a.mix, a.table_density, a.text_density, a.seed)
+        return
+    out_dir = a.out
     ensure_dir(out_dir)
     
     create_native_invoice(os.path.join(out_dir, "synthetic_native_invoice.pdf"))
     create_fake_scanned_doc(os.path.join(out_dir, "synthetic_scanned_doc.pdf"))
     create_table_doc(os.path.join(out_dir, "synthetic_table.pdf"))
-    print("Done. Synthetic PDFs created in 'in_synthetic/'")
+    print(f"Done. Synthetic PDFs created in '{out_dir}/'")
 
 if __name__ == "__main__":
     main()
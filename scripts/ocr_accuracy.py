@@ -0,0 +1,131 @@
+"""
+Compare DeepSeek-OCR output at reduced precision with the fp32 path.
+
+  python scripts/ocr_accuracy.py --corpus bench_corpus --generate "--docs 40 --mix scanned=1" \
+      --precision bf16,int8 --max-wer 0.02
+
+The scanned and mixed documents of a synthetic corpus (all documents when there is
+no corpus.json) are OCR'd once per precision with --ocr deepseek. The report holds
+pages/s, peak RSS and the precision the model actually ran in (docmeta
+meta.ocr_precision) for each run, plus the word error rate of each reduced-precision
+run against the fp32 text. The exit code is 1 when a precision's WER exceeds --max-wer.
+Needs torch, transformers and the DeepSeek-OCR weights (--ocr stub has no precision).
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from bench import ROOT, ocr_weights_available
+
+def select_docs(corpus):
+    meta = os.path.join(corpus, "corpus.json")
+    if not os.path.exists(meta):
+        return sorted(f for f in os.listdir(corpus) if f.lower().endswith(".pdf"))
+    with open(meta, "r", encoding="utf-8") as f:
+        return [d["file"] for d in json.load(f)["docs"] if d.get("scanned_pages")]
+
+def run(inp, precision, workers, extra):
+    out = tempfile.mkdtemp(prefix=f"mini_pengin_ocr_{precision}_")
+    cmd = [sys.executable, "-m", "mini_pengin", "--input", inp, "--out", out, "--force", "--progress", "0",
+           "--results", "ndjson", "--ocr", "deepseek", "--ocr-precision", precision, "--tables", "off",
+           "--workers", str(workers)] + extra
+    t0 = time.perf_counter()
+    p = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    lines = p.stdout.read().splitlines()
+    _, status, ru = os.wait4(p.pid, 0)
+    p.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - t0
+    if p.returncode != 0:
+        raise SystemExit(f"run failed: {shlex.join(cmd)}")
+    texts, pages, loaded = {}, 0, set()
+    for l in lines:
+        r = json.loads(l)
+        if "doc_id" not in r:
+            continue
+        pages += r["pages"]
+        with open(os.path.join(r["out"], "text.txt"), "r", encoding="utf-8") as f:
+            texts[os.path.basename(r["path"])] = f.read()
+        with open(os.path.join(r["out"], "docmeta.json"), "r", encoding="utf-8") as f:
+            loaded.add(json.load(f)["meta"].get("ocr_precision"))
+    shutil.rmtree(out, ignore_errors=True)
+    rss = ru.ru_maxrss / (1 << 20) if sys.platform == "darwin" else ru.ru_maxrss / 1024
+    return {"wall_s": round(wall, 3), "pages": pages, "pages_per_s": round(pages / wall, 3),
+            "peak_rss_mb": round(rss, 1), "loaded_precision": ",".join(sorted(p for p in loaded if p)) or None}, texts
+
+def word_edits(ref, hyp):
+    """Word-level Levenshtein distance."""
+    a, b = ref.split(), hyp.split()
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i]
+        for j, y in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y)))
+        prev = cur
+    return prev[-1]
+
+def main():
+    ap = argparse.ArgumentParser(description="DeepSeek-OCR reduced-precision accuracy check against fp32")
+    ap.add_argument("--corpus", required=True)
+    ap.add_argument("--generate", default=None, help="generate_synthetic.py arguments to create --corpus if missing")
+    ap.add_argument("--precision", default="bf16,int8", help="precisions compared with fp32")
+    ap.add_argument("--max-wer", type=float, default=0.02, help="allowed word error rate against fp32")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--extra", default="", help="more mini_pengin arguments for every run")
+    ap.add_argument("--report", default=None, help="write the report JSON here")
+    a = ap.parse_args()
+
+    if not ocr_weights_available():
+        raise SystemExit("torch, transformers and the DeepSeek-OCR weights are required")
+    if not os.path.isdir(a.corpus):
+        if a.generate is None:
+            raise SystemExit(f"corpus not found: {a.corpus} (pass --generate to create it)")
+        subprocess.check_call([sys.executable, os.path.join(ROOT, "scripts", "generate_synthetic.py"),
+                               "--out", a.corpus] + shlex.split(a.generate))
+    corpus = os.path.abspath(a.corpus)
+    docs = select_docs(corpus)
+    if not docs:
+        raise SystemExit("no scanned documents in the corpus")
+    inp = tempfile.mkdtemp(prefix="mini_pengin_ocr_in_")
+    for d in docs:
+        os.symlink(os.path.join(corpus, d), os.path.join(inp, d))
+
+    extra = shlex.split(a.extra)
+    report = {"corpus": corpus, "docs": len(docs), "max_wer": a.max_wer, "runs": {}}
+    try:
+        row, ref = run(inp, "fp32", a.workers, extra)
+        report["runs"]["fp32"] = row
+        print(f"{'fp32':<6} {row['pages_per_s']:8.3f} pages/s  rss {row['peak_rss_mb']} MB", flush=True)
+        failed = []
+        for prec in a.precision.split(","):
+            row, hyp = run(inp, prec, a.workers, extra)
+            edits = sum(word_edits(ref[d], hyp.get(d, "")) for d in ref)
+            words = sum(len(t.split()) for t in ref.values())
+            row["wer"] = round(edits / max(1, words), 4)
+            row["identical_docs"] = sum(ref[d] == hyp.get(d) for d in ref)
+            row["speedup"] = round(row["pages_per_s"] / max(1e-9, report["runs"]["fp32"]["pages_per_s"]), 3)
+            report["runs"][prec] = row
+            if row["loaded_precision"] != prec:
+                print(f"[NOTE] {prec} requested, model ran in {row['loaded_precision']}", flush=True)
+            print(f"{prec:<6} {row['pages_per_s']:8.3f} pages/s  rss {row['peak_rss_mb']} MB  x{row['speedup']}  "
+                  f"WER {row['wer']:.2%}  identical {row['identical_docs']}/{len(ref)}", flush=True)
+            if row["wer"] > a.max_wer:
+                failed.append(prec)
+    finally:
+        shutil.rmtree(inp, ignore_errors=True)
+
+    if a.report:
+        with open(a.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    for prec in failed:
+        print(f"[ACCURACY] {prec}: WER {report['runs'][prec]['wer']:.2%} > {a.max_wer:.2%}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()